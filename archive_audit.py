@@ -0,0 +1,17 @@
+"""Arsipkan audit log lama ke file JSONL terkompresi per bulan.
+
+    python archive_audit.py            # entri lebih lama dari AUDIT_RETENTION_DAYS
+    python archive_audit.py 30         # entri lebih lama dari 30 hari
+"""
+import sys
+from datetime import datetime, timedelta
+
+from app import create_app
+from audit import archive_audit_logs
+
+if __name__ == '__main__':
+    app = create_app()
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else app.config['AUDIT_RETENTION_DAYS']
+    with app.app_context():
+        archived = archive_audit_logs(datetime.utcnow() - timedelta(days=days), app.config['AUDIT_ARCHIVE_DIR'])
+        print(f'{archived} entri audit log diarsipkan ke {app.config["AUDIT_ARCHIVE_DIR"]}.')
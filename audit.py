@@ -0,0 +1,232 @@
+"""Pencatatan, penelusuran dan pengarsipan audit log.
+
+Listener mapper hanya mengumpulkan perubahan ke `session.info`. Perubahan
+ditulis ke tabel audit_log dengan satu INSERT executemany pada koneksi yang
+sama dengan transaksinya, sehingga audit ikut commit atau rollback bersama
+data yang diubah dan tidak ada buffer yang hilang saat proses berhenti.
+
+Tampilan audit log memakai filter ber-index dan paginasi keyset pada
+(timestamp, id); entri lama dapat dipindahkan ke file JSONL terkompresi
+per bulan dengan archive_audit_logs().
+"""
+import base64
+import binascii
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context, has_request_context
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from models import db, AuditLog
+from sqlite_tuning import read_only
+
+DEFAULT_FLUSH_SIZE = 500
+PENDING_KEY = 'audit_pending'
+COMMITTING_KEY = 'audit_committing'
+
+
+def flush_size():
+    if has_app_context():
+        return current_app.config.get('AUDIT_FLUSH_SIZE', DEFAULT_FLUSH_SIZE)
+    return DEFAULT_FLUSH_SIZE
+
+
+def current_user_id():
+    if has_request_context() and current_user.is_authenticated:
+        return current_user.id
+    return None
+
+
+def _record(target, action, changes):
+    object_session(target).info.setdefault(PENDING_KEY, []).append({
+        'action': action,
+        'model': target.__tablename__,
+        'model_id': target.id,
+        'changes': json.dumps(changes),
+        'timestamp': datetime.utcnow(),
+        'user_id': current_user_id(),
+    })
+
+
+def _first(values):
+    return str(values[0]) if values else None
+
+
+def after_insert(mapper, connection, target):
+    changes = {c.name: str(getattr(target, c.name)) for c in target.__table__.columns}
+    _record(target, 'insert', changes)
+
+
+def after_update(mapper, connection, target):
+    state = db.inspect(target)
+    changes = {attr.key: [_first(attr.history.deleted), _first(attr.history.added)]
+               for attr in state.attrs if attr.history.has_changes()}
+    if changes:
+        _record(target, 'update', changes)
+
+
+def after_delete(mapper, connection, target):
+    changes = {c.name: str(getattr(target, c.name)) for c in target.__table__.columns}
+    _record(target, 'delete', changes)
+
+
+def write_pending(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        session.connection().execute(AuditLog.__table__.insert(), pending)
+
+
+def _after_flush(session, flush_context):
+    # Tulis per batch, atau semuanya bila flush ini bagian dari commit
+    pending = session.info.get(PENDING_KEY, [])
+    if session.info.get(COMMITTING_KEY) or len(pending) >= flush_size():
+        write_pending(session)
+
+
+def _before_commit(session):
+    session.info[COMMITTING_KEY] = True
+    write_pending(session)
+
+
+def _after_transaction_end(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(COMMITTING_KEY, None)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
+
+
+def init_audit(models):
+    # Aman dipanggil berulang (satu kali per create_app), listener tidak didaftarkan dua kali
+    for cls in models:
+        _listen_once(cls, 'after_insert', after_insert)
+        _listen_once(cls, 'after_update', after_update)
+        _listen_once(cls, 'after_delete', after_delete)
+    _listen_once(db.session, 'after_flush', _after_flush)
+    _listen_once(db.session, 'before_commit', _before_commit)
+    _listen_once(db.session, 'after_transaction_end', _after_transaction_end)
+    _listen_once(db.session, 'after_soft_rollback', _after_soft_rollback)
+
+
+def _listen_once(target, name, fn):
+    if not event.contains(target, name, fn):
+        event.listen(target, name, fn)
+
+
+EXPORT_COLUMNS = ('id', 'timestamp', 'action', 'model', 'model_id', 'user_id', 'changes')
+
+
+def filtered_query(args):
+    """Query audit log dengan filter dari query string (model, model_id, user_id, action, start, end)."""
+    query = AuditLog.query
+    for name in ('model', 'action'):
+        if args.get(name):
+            query = query.filter(getattr(AuditLog, name) == args[name])
+    for name in ('model_id', 'user_id'):
+        value = args.get(name, type=int)
+        if value is not None:
+            query = query.filter(getattr(AuditLog, name) == value)
+    start = args.get('start', type=_parse_date)
+    end = args.get('end', type=_parse_date)
+    if start is not None:
+        query = query.filter(AuditLog.timestamp >= start)
+    if end is not None:
+        query = query.filter(AuditLog.timestamp < end + timedelta(days=1))
+    return query
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def encode_cursor(log):
+    data = {'ts': log.timestamp.isoformat(), 'id': log.id}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        return datetime.fromisoformat(data['ts']), int(data['id'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+
+def audit_page(query, after=None, per_page=50):
+    """Satu halaman audit log terbaru lebih dulu, dimulai setelah cursor `after`."""
+    if after is not None:
+        query = query.filter(db.tuple_(AuditLog.timestamp, AuditLog.id) < after)
+    rows = query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(per_page + 1).all()
+    next_cursor = encode_cursor(rows[per_page - 1]) if len(rows) > per_page else None
+    return rows[:per_page], next_cursor
+
+
+def export_rows(query, fmt, batch_size=1000):
+    """Generator CSV/JSONL untuk respons streaming; baris dibaca per batch.
+
+    Generator berjalan setelah view selesai (di luar `read_only_view`), jadi
+    mode read-only dipasang di sini agar query memakai pool `reports`.
+    """
+    columns = [getattr(AuditLog, name) for name in EXPORT_COLUMNS]
+    stmt = query.with_entities(*columns).order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()) \
+        .statement.execution_options(yield_per=batch_size)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(EXPORT_COLUMNS)
+    with read_only(db.session):
+        for partition in db.session.execute(stmt).partitions():
+            for row in partition:
+                if fmt == 'csv':
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(_row_dict(row)) + '\n')
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _row_dict(row):
+    data = dict(zip(EXPORT_COLUMNS, row))
+    data['timestamp'] = data['timestamp'].isoformat() if data['timestamp'] else None
+    return data
+
+
+def archive_audit_logs(before, directory, batch_size=5000):
+    """Pindahkan audit log sebelum `before` ke file audit_YYYY-MM.jsonl.gz.
+
+    Setiap batch ditulis dan di-flush ke file terlebih dahulu, baru kemudian
+    dihapus dari database. Mengembalikan jumlah entri yang diarsipkan.
+    """
+    os.makedirs(directory, exist_ok=True)
+    columns = [getattr(AuditLog, name) for name in EXPORT_COLUMNS]
+    archived = 0
+    while True:
+        rows = db.session.query(*columns).filter(AuditLog.timestamp < before) \
+            .order_by(AuditLog.id).limit(batch_size).all()
+        if not rows:
+            return archived
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row.timestamp.strftime('%Y-%m'), []).append(row)
+        for month, month_rows in by_month.items():
+            # Mode append pada gzip menambah member baru; file tetap bisa dibaca utuh
+            with gzip.open(os.path.join(directory, f'audit_{month}.jsonl.gz'), 'at', encoding='utf-8') as f:
+                for row in month_rows:
+                    f.write(json.dumps(_row_dict(row)) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        ids = [row.id for row in rows]
+        db.session.query(AuditLog).filter(AuditLog.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        archived += len(rows)
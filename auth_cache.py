@@ -0,0 +1,144 @@
+"""Cache identitas user dan pembatasan percobaan login.
+
+`load_user` dipanggil di setiap request yang memakai sesi login. Data yang
+dibutuhkan (id, username, role) disimpan di memori proses sebagai
+`CachedUser` dengan TTL, dan dibuang saat baris user diubah lewat ORM. Pada
+deployment multi-worker, worker lain melihat perubahan paling lambat setelah
+TTL habis.
+
+`LoginThrottle` menolak percobaan login sebelum hash password dihitung bila
+IP atau username sudah terlalu sering gagal dalam jendela waktu tertentu.
+"""
+import threading
+import time
+from collections import deque
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from models import db, User
+
+MAX_THROTTLE_KEYS = 10000  # batas jumlah IP/username yang dilacak sebelum entri lama disapu
+
+
+class CachedUser(UserMixin):
+    """Salinan ringan User yang tidak terikat ke session database."""
+
+    def __init__(self, id, username, role):
+        self.id = id
+        self.username = username
+        self.role = role
+
+    def has_role(self, role):
+        return self.role == role
+
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+
+class UserCache:
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def put(self, user):
+        cached = CachedUser(user.id, user.username, user.role)
+        with self.lock:
+            self.entries[user.id] = (time.monotonic() + self.ttl, cached)
+        return cached
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        user = db.session.get(User, user_id)
+        if user is None:
+            self.invalidate(user_id)
+            return None
+        return self.put(user)
+
+    def invalidate(self, user_id=None):
+        with self.lock:
+            if user_id is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(user_id, None)
+
+
+def _invalidate_user(mapper, connection, target):
+    cache = current_app.extensions.get('user_cache') if has_app_context() else None
+    if cache is not None:
+        cache.invalidate(target.id)
+
+
+def init_user_cache():
+    """Buang entri cache app aktif setiap kali baris user diubah atau dihapus.
+
+    Aman dipanggil berulang (satu kali per create_app): listener hanya satu dan
+    mencari cache lewat `current_app`, sehingga app lama tidak ikut tertahan.
+    """
+    for name in ('after_update', 'after_delete'):
+        if not event.contains(User, name, _invalidate_user):
+            event.listen(User, name, _invalidate_user)
+
+
+class LoginThrottle:
+    """Batasi percobaan login gagal per kunci (IP dan username) dalam jendela waktu."""
+
+    def __init__(self, max_attempts=5, window=300):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.lock = threading.Lock()
+        self.failures = {}
+
+    def _recent(self, key, now):
+        attempts = self.failures.get(key)
+        if attempts is None:
+            return 0
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self.failures[key]
+            return 0
+        return len(attempts)
+
+    def retry_after(self, *keys):
+        """Detik sampai kunci boleh mencoba lagi, atau 0 bila tidak dibatasi."""
+        now = time.monotonic()
+        with self.lock:
+            blocked = [self.failures[key][-self.max_attempts] + self.window - now for key in keys
+                       if self._recent(key, now) >= self.max_attempts]
+        return max(blocked, default=0)
+
+    def fail(self, *keys):
+        now = time.monotonic()
+        with self.lock:
+            if len(self.failures) > MAX_THROTTLE_KEYS:
+                for key in list(self.failures):
+                    self._recent(key, now)
+            for key in keys:
+                self._recent(key, now)
+                self.failures.setdefault(key, deque()).append(now)
+
+    def reset(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.failures.pop(key, None)
+
+
+_dummy_hash = None
+
+
+def verify_password(user, password):
+    """Satu kali cek hash, juga untuk username yang tidak ada agar waktunya tidak membedakan."""
+    global _dummy_hash
+    if user is None:
+        if _dummy_hash is None:
+            _dummy_hash = generate_password_hash('')
+        check_password_hash(_dummy_hash, password)
+        return False
+    return user.check_password(password)
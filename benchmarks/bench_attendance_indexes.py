@@ -0,0 +1,71 @@
+"""Ukur query absensi sebelum dan sesudah index Attendance ditambahkan.
+
+Dataset sintetis multi-tahun dibuat di file SQLite sementara:
+
+    python -m benchmarks.bench_attendance_indexes [siswa] [hari_sekolah]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy import text
+
+from models import db, Attendance, month_range, totals_by_range
+from migrate_db import upgrade
+from benchmarks.common import make_app, seed
+
+REPEAT = 20
+
+
+def measure(student_ids):
+    day = date(2025, 3, 12)
+    sample = student_ids[::max(1, len(student_ids) // REPEAT)][:REPEAT]
+    # GROUP BY langsung ke tabel attendance; totals_by_month membaca monthly_summary dan tidak memakai index ini
+    start_date, end_date = month_range(2025, 3)
+    cases = {
+        'rekap_by_date': lambda: Attendance.query.filter_by(tanggal=day).all(),
+        'monthly_totals': lambda: totals_by_range(start_date, end_date),
+        'student_month_totals': lambda: [totals_by_range(start_date, end_date, [sid]) for sid in sample],
+        'absence_count': lambda: [Attendance.query.filter_by(student_id=sid, status='A').count() for sid in sample],
+    }
+    timings = {}
+    for name, case in cases.items():
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            case()
+        timings[name] = round((time.perf_counter() - start) * 1000 / REPEAT, 3)
+    return timings
+
+
+def run(n_students=500, n_days=600):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        app = make_app(f'sqlite:///{path}')
+        with app.app_context():
+            db.create_all()
+            for index in Attendance.__table__.indexes:
+                db.session.execute(text(f'DROP INDEX {index.name}'))
+            student_ids = seed(n_students, n_days, start=date(2023, 1, 2))
+            rows = Attendance.query.count()
+            before = measure(student_ids)
+            upgrade()
+            after = measure(student_ids)
+            db.session.remove()
+    finally:
+        os.unlink(path)
+    return {
+        'students': n_students,
+        'school_days': n_days,
+        'attendance_rows': rows,
+        'before_ms': before,
+        'after_ms': after,
+    }
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    print(json.dumps(run(*args), indent=2))
@@ -0,0 +1,49 @@
+"""Bandingkan rekap bulanan per-siswa (lama) dengan agregasi GROUP BY.
+
+Jalankan dari root repository:
+
+    python -m benchmarks.bench_monthly_totals
+"""
+import json
+import sys
+
+from models import db, Student, Attendance, month_range, totals_by_month
+from benchmarks.common import make_app, seed, timer, QueryCounter
+
+
+def legacy_totals(students, year, month):
+    # Empat COUNT per siswa, seperti implementasi sebelumnya
+    start_date, end_date = month_range(year, month)
+    totals = {}
+    for student in students:
+        base = Attendance.query.filter_by(student_id=student.id) \
+            .filter(Attendance.tanggal >= start_date, Attendance.tanggal < end_date)
+        totals[student.id] = tuple(base.filter_by(status=s).count() for s in 'HAIS')
+    return totals
+
+
+def run(sizes=(10, 100, 1000), days=22):
+    results = []
+    for n_students in sizes:
+        app = make_app()
+        with app.app_context():
+            db.create_all()
+            seed(n_students, days)
+            students = Student.query.all()
+            result = {'students': n_students}
+            with QueryCounter(db.engine) as counter, timer(result, 'legacy_ms'):
+                legacy = legacy_totals(students, 2024, 1)
+            result['legacy_queries'] = counter.count
+            totals_by_month(2024, 1)  # bangun monthly_summary terlebih dahulu
+            with QueryCounter(db.engine) as counter, timer(result, 'batched_ms'):
+                batched = totals_by_month(2024, 1)
+            result['batched_queries'] = counter.count
+            assert all(legacy[s.id] == batched[s.id] for s in students)
+            results.append(result)
+            db.drop_all()
+    return results
+
+
+if __name__ == '__main__':
+    sizes = tuple(int(arg) for arg in sys.argv[1:]) or (10, 100, 1000)
+    print(json.dumps(run(sizes), indent=2))
@@ -0,0 +1,132 @@
+"""Uji beban penulis/pembaca bersamaan pada SQLite: default vs WAL + pool read-only.
+
+Beberapa thread penulis menyimpan absensi satu kelas (seperti guru yang
+mengisi absensi pukul 07:15) sementara thread pembaca membuka rekap bulanan
+dan data grafik. Dilaporkan throughput, latensi p95 dan jumlah error
+"database is locked" untuk masing-masing konfigurasi.
+
+    python -m benchmarks.bench_sqlite_concurrency [--writers 8] [--readers 8] [--seconds 10]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date
+
+from sqlalchemy.exc import OperationalError
+
+from models import db, Student, save_attendance, totals_by_month, attendance_matrix
+from migrate_db import upgrade
+from sqlite_tuning import DEFAULT_PRAGMAS, REPORT_BIND, engine_options, read_only_uri, init_sqlite, read_only
+from benchmarks.common import make_app, seed, school_days
+from benchmarks.loadtest import percentile
+
+START = date(2024, 1, 1)
+
+
+def tuned_config(uri):
+    config = {'SQLALCHEMY_DATABASE_URI': uri, 'SQLITE_PRAGMAS': dict(DEFAULT_PRAGMAS),
+              'SQLITE_POOL_SIZE': 10, 'SQLITE_MAX_OVERFLOW': 10}
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(config)
+    config['SQLALCHEMY_BINDS'] = {REPORT_BIND: read_only_uri(uri)}
+    return config
+
+
+def worker(app, stats, stop, func):
+    latencies, errors, other = [], 0, 0
+    while not stop.is_set():
+        with app.app_context():
+            start = time.perf_counter()
+            try:
+                func()
+                latencies.append((time.perf_counter() - start) * 1000)
+            except OperationalError as e:
+                db.session.rollback()
+                if 'locked' in str(e):
+                    errors += 1
+                else:
+                    other += 1
+    with stats['lock']:
+        stats['latencies'] += latencies
+        stats['locked'] += errors
+        stats['errors'] += other
+
+
+def run_config(name, tuned, args):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    uri = f'sqlite:///{path}'
+    try:
+        app = make_app(**tuned_config(uri)) if tuned else make_app(uri)
+        with app.app_context():
+            if tuned:
+                init_sqlite(db, app.config)
+            upgrade()
+            seed(args.students, args.days, START, classes=[f'Kelas {i}' for i in range(args.writers)])
+            classes = {}
+            for student in Student.query:
+                classes.setdefault(student.kelas, []).append(student.id)
+        days = list(school_days(START, args.days))
+        last_day = days[-1]
+
+        def writer(student_ids, rng):
+            def write():
+                day = rng.choice(days)
+                save_attendance(day, {sid: rng.choices('HAIS', weights=(90, 3, 4, 3))[0] for sid in student_ids})
+            return write
+
+        def reader():
+            with read_only(db.session):
+                totals_by_month(last_day.year, last_day.month)
+                attendance_matrix(days[-20], last_day)
+
+        results = {}
+        stop = threading.Event()
+        groups = {
+            'write': [writer(ids, random.Random(i)) for i, ids in enumerate(classes.values())],
+            'read': [reader] * args.readers,
+        }
+        stats = {kind: {'lock': threading.Lock(), 'latencies': [], 'locked': 0, 'errors': 0} for kind in groups}
+        threads = [threading.Thread(target=worker, args=(app, stats[kind], stop, func))
+                   for kind, funcs in groups.items() for func in funcs]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        for kind, stat in stats.items():
+            latencies = stat['latencies'] or [0]
+            results[kind] = {
+                'ops': len(stat['latencies']),
+                'ops_per_sec': round(len(stat['latencies']) / args.seconds, 1),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'locked_errors': stat['locked'],
+                'other_errors': stat['errors'],
+            }
+        with app.app_context():
+            db.engine.dispose()
+            db.engines.get(REPORT_BIND, db.engine).dispose()
+        return {'config': name, **results}
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8, help='thread penulis, satu per kelas')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--students', type=int, default=288)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--seconds', type=float, default=10)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print(json.dumps([run_config('default', False, args), run_config('wal_read_only_pool', True, args)], indent=2))
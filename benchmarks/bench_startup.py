@@ -0,0 +1,73 @@
+"""Ukur cold start satu worker: waktu import app, create_app, request pertama dan RSS.
+
+Setiap percobaan dijalankan di proses Python baru (seperti worker gunicorn
+yang baru di-fork tanpa --preload) dengan database SQLite sementara.
+Dilaporkan median dari beberapa percobaan dan modul berat yang ikut termuat.
+
+    python -m benchmarks.bench_startup [--runs 5] [--repo PATH]
+
+`--repo` menunjuk checkout lain (misalnya versi sebelum app factory) untuk
+dibandingkan; bila modul app di sana belum punya `create_app`, objek `app.app`
+yang dipakai.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'matplotlib', 'telegram', 'pdfkit', 'openpyxl', 'flask_restful')
+
+PROBE = '''
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import app as module
+imported = time.perf_counter()
+application = module.create_app() if hasattr(module, 'create_app') else module.app
+created = time.perf_counter()
+application.test_client().get('/login')
+first_request = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (first_request - created) * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': len(sys.modules),
+    'heavy': sorted(name for name in json.loads(sys.argv[2]) if name in sys.modules),
+}))
+'''
+
+
+def probe(repo):
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.join(workdir, "startup.db")}')
+        output = subprocess.run([sys.executable, '-c', PROBE, repo, json.dumps(HEAVY_MODULES)],
+                                cwd=workdir, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repo, runs):
+    samples = [probe(repo) for _ in range(runs)]
+    result = {'repo': repo, 'runs': runs}
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'rss_mb'):
+        result[key] = round(statistics.median(sample[key] for sample in samples), 1)
+    result['total_ms'] = round(result['import_ms'] + result['create_app_ms'] + result['first_request_ms'], 1)
+    result['modules'] = samples[-1]['modules']
+    result['heavy_modules'] = samples[-1]['heavy']
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--repo', action='append', help='checkout yang diukur (boleh lebih dari satu)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print(json.dumps([run(os.path.abspath(repo), args.runs) for repo in args.repo or [ROOT]], indent=2))
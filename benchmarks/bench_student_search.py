@@ -0,0 +1,60 @@
+"""Bandingkan pencarian LIKE + OFFSET/COUNT dengan FTS5 + keyset.
+
+    python -m benchmarks.bench_student_search [jumlah_siswa ...]
+"""
+import json
+import random
+import sys
+import time
+
+from models import db, Student
+from student_search import create_search_index, search_filter, keyset_page
+from benchmarks.common import make_app
+
+REPEAT = 20
+FIRST_NAMES = ['Aditya', 'Budi', 'Citra', 'Dewi', 'Eko', 'Fajar', 'Gita', 'Hadi', 'Indah', 'Joko']
+LAST_NAMES = ['Saputra', 'Santoso', 'Pratama', 'Wijaya', 'Lestari', 'Nugroho', 'Rahmawati', 'Hidayat']
+
+
+def seed_students(n, rng):
+    db.session.execute(Student.__table__.insert(), [
+        {'nama': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}', 'kelas': f'{rng.choice(["X", "XI", "XII"])} {rng.randint(1, 9)}'}
+        for i in range(n)
+    ])
+    db.session.commit()
+
+
+def average_ms(func):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func()
+    return round((time.perf_counter() - start) * 1000 / REPEAT, 3)
+
+
+def run(sizes=(1000, 10000, 100000)):
+    results = []
+    for n in sizes:
+        app = make_app()
+        with app.app_context():
+            db.create_all()
+            seed_students(n, random.Random(7))
+            create_search_index()
+            deep_page = max(1, n // 160)  # halaman di tengah hasil pencarian (~1/8 nama cocok)
+            like = Student.query.filter(Student.nama.ilike('%ntos%'))
+            fts = Student.query.filter(search_filter('ntos'))
+            last_id = fts.order_by(Student.id).offset(deep_page * 10).limit(1).first().id
+            results.append({
+                'students': n,
+                'like_offset_ms': average_ms(lambda: like.paginate(page=deep_page, per_page=10, error_out=False)),
+                'fts_keyset_ms': average_ms(lambda: keyset_page(fts, after=last_id)),
+                'list_offset_ms': average_ms(lambda: Student.query.paginate(page=deep_page, per_page=10, error_out=False)),
+                'list_keyset_ms': average_ms(lambda: keyset_page(Student.query, after=deep_page * 10)),
+            })
+            db.session.remove()
+            db.drop_all()
+    return results
+
+
+if __name__ == '__main__':
+    sizes = tuple(int(arg) for arg in sys.argv[1:]) or (1000, 10000, 100000)
+    print(json.dumps(run(sizes), indent=2))
@@ -0,0 +1,75 @@
+"""Utilitas bersama untuk skrip benchmark.
+
+Benchmark berjalan di atas database SQLite terpisah sehingga tidak menyentuh
+instance/attendance.db milik aplikasi.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from flask import Flask
+from sqlalchemy import event
+
+from models import db, Student, Attendance
+
+
+def make_app(uri='sqlite://', **config):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.update(config)
+    db.init_app(app)
+    return app
+
+
+class QueryCounter:
+    """Menghitung jumlah statement SQL yang dieksekusi oleh satu atau beberapa engine."""
+
+    def __init__(self, *engines):
+        self.engines = engines
+        self.count = 0
+
+    def _callback(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, 'before_cursor_execute', self._callback)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, 'before_cursor_execute', self._callback)
+
+
+@contextmanager
+def timer(result, key):
+    start = time.perf_counter()
+    yield
+    result[key] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def school_days(start, days):
+    current = start
+    while days > 0:
+        if current.weekday() < 5:
+            yield current
+            days -= 1
+        current += timedelta(days=1)
+
+
+def seed(n_students, n_days, start=date(2024, 1, 1), classes=('XII TE 1', 'XII TE 2', 'XII TE 3'), rng=None):
+    rng = rng or random.Random(42)
+    db.session.execute(Student.__table__.insert(), [
+        {'nama': f'Siswa {i}', 'kelas': classes[i % len(classes)]} for i in range(n_students)
+    ])
+    student_ids = [row[0] for row in db.session.query(Student.id)]
+    for day in school_days(start, n_days):
+        db.session.execute(Attendance.__table__.insert(), [
+            {'student_id': student_id, 'tanggal': day,
+             'status': rng.choices('HAIS', weights=(90, 3, 4, 3))[0]}
+            for student_id in student_ids
+        ])
+    db.session.commit()
+    return student_ids
@@ -0,0 +1,72 @@
+"""Generator data sekolah sintetis: N kelas x M siswa x K hari sekolah.
+
+Setiap siswa punya kecenderungan sendiri: sebagian besar hampir selalu
+hadir, sebagian kecil sering alfa. Sakit datang berurutan beberapa hari,
+dan izin tersebar acak. Data ditulis langsung dengan INSERT executemany.
+"""
+import random
+from datetime import date
+
+from models import db, Student, Attendance
+from benchmarks.common import school_days
+
+GRADES = ('X', 'XI', 'XII')
+MAJORS = ('TE', 'TKJ', 'RPL', 'AK', 'TKR')
+FIRST_NAMES = ('Aditya', 'Budi', 'Citra', 'Dewi', 'Eko', 'Fajar', 'Gita', 'Hadi', 'Indah', 'Joko',
+               'Kurnia', 'Lestari', 'Muhammad', 'Nanda', 'Putri', 'Rizky', 'Sari', 'Taufik', 'Wulan', 'Yusuf')
+LAST_NAMES = ('Saputra', 'Santoso', 'Pratama', 'Wijaya', 'Lestari', 'Nugroho', 'Rahmawati', 'Hidayat',
+              'Kusuma', 'Permana', 'Siregar', 'Nasution', 'Hakim', 'Ramadhani', 'Syahputra')
+
+
+def class_names(n):
+    return [f'{GRADES[i % len(GRADES)]} {MAJORS[(i // len(GRADES)) % len(MAJORS)]} {i // (len(GRADES) * len(MAJORS)) + 1}'
+            for i in range(n)]
+
+
+def student_profile(rng):
+    # Peluang alfa dan izin per hari, serta peluang mulai sakit
+    if rng.random() < 0.08:
+        return {'alfa': rng.uniform(0.05, 0.15), 'izin': rng.uniform(0.01, 0.04), 'sakit': 0.02}
+    return {'alfa': rng.uniform(0.0, 0.01), 'izin': rng.uniform(0.0, 0.02), 'sakit': 0.01}
+
+
+def generate(n_classes=10, students_per_class=36, n_days=120, start=date(2024, 1, 8), seed=42, chunk_size=20000):
+    """Isi database aktif dan kembalikan ringkasan dataset."""
+    rng = random.Random(seed)
+    db.session.execute(Student.__table__.insert(), [
+        {'nama': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {kelas_index * students_per_class + i + 1}', 'kelas': kelas}
+        for kelas_index, kelas in enumerate(class_names(n_classes)) for i in range(students_per_class)
+    ])
+    student_ids = [row[0] for row in db.session.query(Student.id).order_by(Student.id)]
+    profiles = {student_id: student_profile(rng) for student_id in student_ids}
+    sick_days_left = dict.fromkeys(student_ids, 0)
+
+    days = list(school_days(start, n_days))
+    rows = []
+    for day in days:
+        for student_id in student_ids:
+            profile = profiles[student_id]
+            if sick_days_left[student_id] > 0:
+                sick_days_left[student_id] -= 1
+                status = 'S'
+            elif rng.random() < profile['sakit']:
+                sick_days_left[student_id] = rng.randint(0, 3)
+                status = 'S'
+            else:
+                roll = rng.random()
+                status = 'A' if roll < profile['alfa'] else 'I' if roll < profile['alfa'] + profile['izin'] else 'H'
+            rows.append({'student_id': student_id, 'tanggal': day, 'status': status})
+            if len(rows) >= chunk_size:
+                db.session.execute(Attendance.__table__.insert(), rows)
+                rows = []
+    if rows:
+        db.session.execute(Attendance.__table__.insert(), rows)
+    db.session.commit()
+    return {
+        'classes': n_classes,
+        'students': len(student_ids),
+        'school_days': len(days),
+        'attendance_rows': len(days) * len(student_ids),
+        'first_day': days[0].isoformat() if days else None,
+        'last_day': days[-1].isoformat() if days else None,
+    }
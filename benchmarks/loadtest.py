@@ -0,0 +1,181 @@
+"""Load test aplikasi sungguhan lewat Flask test client di atas data sintetis.
+
+Contoh:
+
+    python -m benchmarks.loadtest --classes 10 --students 36 --days 120 \
+        --iterations 30 --output hasil.json
+    python -m benchmarks.loadtest --compare hasil_lama.json
+
+Hasil berupa JSON berisi throughput, latensi p50/p95/p99 dan rata-rata jumlah
+query per skenario, sehingga dapat dibandingkan antar commit.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from urllib.parse import quote
+
+SCENARIOS = (
+    'total_rekap', 'total_rekap_kelas', 'rekap', 'attendance_data', 'chart_status', 'students', 'students_search',
+    'api_students', 'api_students_page', 'save_index', 'save_rekap', 'save_api',
+)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_requests(dataset, kelas, student_ids, rng):
+    last_day = date.fromisoformat(dataset['last_day'])
+    mid_day = date.fromisoformat(dataset['first_day']) + (last_day - date.fromisoformat(dataset['first_day'])) / 2
+
+    def statuses():
+        return {f'status-{student_id}': rng.choices('HAIS', weights=(90, 3, 4, 3))[0] for student_id in student_ids}
+
+    return {
+        'total_rekap': lambda: ('GET', f'/total_rekap?year={last_day.year}&month={last_day.month}', {}),
+        'total_rekap_kelas': lambda: ('GET', f'/total_rekap?year={last_day.year}&month={last_day.month}&kelas={quote(kelas)}', {}),
+        'rekap': lambda: ('GET', f'/rekap?date={last_day.isoformat()}', {}),
+        'attendance_data': lambda: ('GET', f'/api/attendance_data?start={mid_day.isoformat()}&end={last_day.isoformat()}', {}),
+        'chart_status': lambda: ('GET', f'/charts/status.png?start={mid_day.isoformat()}&end={last_day.isoformat()}', {}),
+        'students': lambda: ('GET', '/students', {}),
+        'students_search': lambda: ('GET', '/students?search=Santoso', {}),
+        'api_students': lambda: ('GET', '/api/students', {}),
+        'api_students_page': lambda: ('GET', '/api/students?limit=100', {}),
+        'save_index': lambda: ('POST', f'/index?kelas={quote(kelas)}', {'data': statuses()}),
+        'save_rekap': lambda: ('POST', f'/rekap?date={mid_day.isoformat()}&kelas={quote(kelas)}', {'data': statuses()}),
+        'save_api': lambda: ('PUT', f'/api/attendance/{mid_day.isoformat()}', {'json': {'records': [
+            {'student_id': student_id, 'status': rng.choices('HAIS', weights=(90, 3, 4, 3))[0]}
+            for student_id in student_ids]}}),
+    }
+
+
+def run(args):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    try:
+        from app import create_app
+        from migrate_db import upgrade
+        from models import db, Student, User
+        from benchmarks.common import QueryCounter
+        from benchmarks.datagen import generate
+
+        app = create_app({'WTF_CSRF_ENABLED': False, 'TELEGRAM_FAKE': True})
+        if not args.cache:
+            app.extensions['report_cache'].clear()
+            app.extensions['report_cache'].maxsize = 0
+            app.extensions['chart_cache'].maxsize = 0
+
+        with app.app_context():
+            upgrade()
+            started = time.perf_counter()
+            dataset = generate(args.classes, args.students, args.days, seed=args.seed)
+            dataset['generate_seconds'] = round(time.perf_counter() - started, 2)
+            user = User(username='bench', role='walikelas')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.commit()
+            first_class = db.session.query(Student.kelas).first()[0]
+            student_ids = [row[0] for row in db.session.query(Student.id).filter_by(kelas=first_class)]
+            engines = list(db.engines.values())
+
+        client = app.test_client()
+        client.post('/login', data={'username': 'bench', 'password': 'bench'})
+        requests = build_requests(dataset, first_class, student_ids, random.Random(args.seed))
+        scenarios = args.scenarios or SCENARIOS
+
+        results = {}
+        for name in scenarios:
+            latencies, queries, errors = [], [], 0
+            for _ in range(args.warmup):
+                method, url, kwargs = requests[name]()
+                client.open(url, method=method, **kwargs)
+            total_start = time.perf_counter()
+            for _ in range(args.iterations):
+                method, url, kwargs = requests[name]()
+                with QueryCounter(*engines) as counter:
+                    start = time.perf_counter()
+                    response = client.open(url, method=method, **kwargs)
+                    response.get_data()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                queries.append(counter.count)
+                if response.status_code >= 400:
+                    errors += 1
+            elapsed = time.perf_counter() - total_start
+            results[name] = {
+                'iterations': args.iterations,
+                'errors': errors,
+                'throughput_rps': round(args.iterations / elapsed, 2),
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'queries_avg': round(sum(queries) / len(queries), 1),
+            }
+        app.extensions['notifier'].stop()
+        app.extensions['chart_renderer'].shutdown()
+    finally:
+        os.unlink(path)
+
+    return {
+        'commit': git_commit(),
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'report_cache': args.cache,
+        'dataset': dataset,
+        'results': results,
+    }
+
+
+def compare(current, previous):
+    lines = [f'{"scenario":<20} {"p95 lama":>10} {"p95 baru":>10} {"selisih":>9} {"query lama":>11} {"query baru":>11}']
+    for name, result in current['results'].items():
+        old = previous['results'].get(name)
+        if old is None:
+            continue
+        change = (result['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0
+        lines.append(f'{name:<20} {old["p95_ms"]:>10} {result["p95_ms"]:>10} {change:>+8.1f}% '
+                     f'{old["queries_avg"]:>11} {result["queries_avg"]:>11}')
+    return '\n'.join(lines)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--classes', type=int, default=10)
+    parser.add_argument('--students', type=int, default=36, help='siswa per kelas')
+    parser.add_argument('--days', type=int, default=120, help='jumlah hari sekolah')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache', action='store_true', help='aktifkan cache laporan')
+    parser.add_argument('--scenario', dest='scenarios', action='append', choices=SCENARIOS)
+    parser.add_argument('--output', help='simpan hasil JSON ke file ini')
+    parser.add_argument('--compare', help='bandingkan dengan hasil JSON sebelumnya')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(report, json.load(f)), file=sys.stderr)
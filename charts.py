@@ -0,0 +1,177 @@
+"""Grafik kehadiran yang dirender di server.
+
+Data diagregasi di database (jumlah status per tanggal, atau status per siswa
+untuk sparkline), lalu gambar PNG/SVG dirender dengan backend Agg matplotlib
+di process pool terbatas agar rendering tidak menahan thread request. Hasil
+disimpan di cache per (jenis, format, kelas, rentang tanggal) di memori
+proses dan dibuang saat absensi pada rentang dan kelas itu berubah. Seperti
+cache rekap `lru`, invalidasi hanya sampai ke worker yang menangani
+penulisan; worker lain menyajikan grafik lama paling lama `ttl` detik.
+"""
+import io
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from models import db, Student, Attendance, STATUSES, attendance_matrix
+
+CHART_KINDS = ('rate', 'status', 'sparklines')
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+STATUS_LABELS = {'H': 'Hadir', 'A': 'Alfa', 'I': 'Izin', 'S': 'Sakit'}
+STATUS_COLORS = {'H': '#28a745', 'A': '#dc3545', 'I': '#ffc107', 'S': '#17a2b8'}
+MAX_SPARKLINES = 60  # batas siswa di grid sparkline agar gambar tetap terbaca
+SPARKLINE_COLUMNS = 4
+
+ChartKey = namedtuple('ChartKey', 'kind fmt kelas start end')
+
+
+def daily_status_counts(start_date, end_date, kelas=None):
+    """Jumlah tiap status per tanggal: (dates, {status: [jumlah per tanggal]})."""
+    query = db.session.query(Attendance.tanggal, Attendance.status, db.func.count(Attendance.id)) \
+        .filter(Attendance.tanggal >= start_date, Attendance.tanggal <= end_date)
+    if kelas:
+        query = query.join(Student, Student.id == Attendance.student_id).filter(Student.kelas == kelas)
+    rows = query.group_by(Attendance.tanggal, Attendance.status).all()
+    dates = sorted({tanggal for tanggal, _, _ in rows})
+    date_index = {tanggal: i for i, tanggal in enumerate(dates)}
+    counts = {status: [0] * len(dates) for status in STATUSES}
+    for tanggal, status, count in rows:
+        if status in counts:
+            counts[status][date_index[tanggal]] = count
+    return dates, counts
+
+
+def chart_data(kind, start_date, end_date, kelas=None):
+    """Data teragregasi yang cukup kecil untuk dikirim ke proses worker."""
+    title_suffix = f' - Kelas {kelas}' if kelas else ''
+    if kind == 'sparklines':
+        dates, students, _, statuses = attendance_matrix(start_date, end_date, kelas)
+        hidden = len(students) - MAX_SPARKLINES
+        if hidden > 0:
+            title_suffix += f' (+{hidden} siswa lain tidak ditampilkan, pilih kelas)'
+        return {
+            'title': f'Kehadiran per Siswa{title_suffix}',
+            'dates': dates,
+            'students': [(student.nama, status) for student, status in zip(students[:MAX_SPARKLINES], statuses)],
+        }
+    dates, counts = daily_status_counts(start_date, end_date, kelas)
+    title = 'Persentase Kehadiran Harian' if kind == 'rate' else 'Status Kehadiran per Tanggal'
+    return {'title': title + title_suffix, 'dates': dates, 'counts': counts}
+
+
+def _draw_rate(fig, data):
+    ax = fig.add_subplot(111)
+    totals = [sum(values) for values in zip(*data['counts'].values())]
+    rates = [hadir * 100 / total if total else 0 for hadir, total in zip(data['counts']['H'], totals)]
+    ax.plot(data['dates'], rates, marker='o', color=STATUS_COLORS['H'])
+    ax.set_ylim(0, 100)
+    ax.set_ylabel('% Hadir')
+    ax.grid(True, alpha=0.3)
+    fig.autofmt_xdate()
+
+
+def _draw_status(fig, data):
+    ax = fig.add_subplot(111)
+    bottom = [0] * len(data['dates'])
+    for status in STATUSES:
+        values = data['counts'][status]
+        ax.bar(data['dates'], values, bottom=bottom, label=STATUS_LABELS[status], color=STATUS_COLORS[status])
+        bottom = [b + v for b, v in zip(bottom, values)]
+    ax.set_ylabel('Jumlah siswa')
+    ax.legend(loc='upper left', fontsize='small')
+    fig.autofmt_xdate()
+
+
+def _draw_sparklines(fig, data):
+    students = data['students'] or [('Tidak ada data', '')]
+    rows = -(-len(students) // SPARKLINE_COLUMNS)
+    fig.set_size_inches(10, max(2, rows * 0.6))
+    for i, (nama, statuses) in enumerate(students):
+        # Satu strip per siswa: setiap hari satu sel berwarna sesuai status, abu-abu bila kosong
+        ax = fig.add_subplot(rows, SPARKLINE_COLUMNS, i + 1)
+        ax.bar(range(len(statuses)), 1, width=1, color=[STATUS_COLORS.get(status, '#e9ecef') for status in statuses])
+        recorded = sum(status in STATUS_COLORS for status in statuses)
+        rate = f' ({statuses.count("H") * 100 // recorded}%)' if recorded else ''
+        ax.set_xlim(-0.5, max(len(statuses), 1) - 0.5)
+        ax.set_title(nama + rate, fontsize=7, loc='left')
+        ax.axis('off')
+
+
+DRAW = {'rate': _draw_rate, 'status': _draw_status, 'sparklines': _draw_sparklines}
+
+
+def render_chart(kind, data, fmt='png'):
+    """Render grafik ke bytes. Dijalankan di proses worker."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 4), layout='constrained')
+    FigureCanvasAgg(fig)
+    DRAW[kind](fig, data)
+    fig.suptitle(data['title'])
+    if not data['dates']:
+        fig.text(0.5, 0.5, 'Tidak ada data kehadiran', ha='center', va='center')
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=100)
+    return buffer.getvalue()
+
+
+class ChartRenderer:
+    def __init__(self, max_workers=2, timeout=30):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def render(self, kind, data, fmt):
+        with self.lock:
+            if self.executor is None:
+                # fork dari proses multi-thread bisa deadlock (lock yang sedang dipegang ikut tersalin)
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                    mp_context=multiprocessing.get_context('forkserver'))
+        return self.executor.submit(render_chart, kind, data, fmt).result(timeout=self.timeout)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+
+class ChartCache:
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires is not None and expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self.lock:
+            self.entries[key] = (expires, entry)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate_date(self, tanggal, kelas=None):
+        """Buang grafik yang rentangnya memuat `tanggal` (untuk kelas itu dan semua kelas)."""
+        with self.lock:
+            for key in [k for k in self.entries if k.start <= tanggal <= k.end
+                        and (kelas is None or k.kelas in (kelas, ''))]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,32 @@
+"""Ekstensi dan layanan bersama yang dipakai oleh blueprint.
+
+Objek di sini dibuat tanpa app; `create_app()` di app.py yang memasangnya.
+Layanan per app (cache laporan, antrean PDF, notifikasi, dan lain-lain)
+disimpan di `app.extensions` dan diakses lewat proxy agar blueprint tidak
+perlu mengimpor app.
+"""
+from flask import current_app
+from flask_login import LoginManager
+from flask_principal import Principal, Permission, RoleNeed
+from werkzeug.local import LocalProxy
+
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
+principals = Principal()
+
+walikelas_permission = Permission(RoleNeed('walikelas'))
+sekretaris_permission = Permission(RoleNeed('sekretaris'))
+
+
+def service(name):
+    return LocalProxy(lambda: current_app.extensions[name])
+
+
+report_cache = service('report_cache')
+chart_cache = service('chart_cache')
+chart_renderer = service('chart_renderer')
+pdf_jobs = service('pdf_jobs')
+notifier = service('notifier')
+metrics = service('metrics')
+user_cache = service('user_cache')
+login_throttle = service('login_throttle')
@@ -1,8 +1,10 @@
-from app import app
+from app import create_app
+from migrate_db import upgrade
 from models import db, User
 
+app = create_app()
 with app.app_context():
-    db.create_all()
+    upgrade()
     if not User.query.filter_by(username='walikelas').first():
         walikelas = User(username='walikelas', role='walikelas')
         walikelas.set_password('password')
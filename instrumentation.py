@@ -0,0 +1,145 @@
+"""Metrik per request: latensi endpoint, jumlah dan waktu query SQL, deteksi N+1.
+
+Data dikumpulkan lewat event cursor SQLAlchemy dan sinyal request Flask, lalu
+disajikan dalam format teks Prometheus. Metrik disimpan per proses; pada
+deployment multi-worker setiap worker melaporkan angkanya sendiri.
+"""
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from flask import g, request, has_request_context, request_started, request_finished, got_request_exception
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+slow_logger = logging.getLogger('attendance.slow_requests')
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self, n_plus_one_threshold=10, slow_request_ms=None):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slow_request_ms = slow_request_ms
+        self.lock = threading.Lock()
+        self.latency = defaultdict(Histogram)
+        self.requests = Counter()
+        self.sql_statements = Counter()
+        self.sql_seconds = Counter()
+        self.n_plus_one = Counter()
+
+    def record(self, endpoint, method, status, seconds, statements, sql_seconds, repeated):
+        with self.lock:
+            self.latency[endpoint].observe(seconds)
+            self.requests[(endpoint, method, status)] += 1
+            self.sql_statements[endpoint] += statements
+            self.sql_seconds[endpoint] += sql_seconds
+            if repeated:
+                self.n_plus_one[endpoint] += 1
+
+    def render(self):
+        lines = []
+        with self.lock:
+            lines += ['# HELP http_requests_total Jumlah request per endpoint.',
+                      '# TYPE http_requests_total counter']
+            for (endpoint, method, status), value in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}')
+            lines += ['# HELP http_request_duration_seconds Latensi request per endpoint.',
+                      '# TYPE http_request_duration_seconds histogram']
+            for endpoint, histogram in sorted(self.latency.items()):
+                cumulative = 0
+                bounds = [str(bound) for bound in histogram.buckets] + ['+Inf']
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram.sum:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+            for name, help_text, values, fmt in (
+                ('sql_statements_total', 'Jumlah statement SQL per endpoint.', self.sql_statements, '{}'),
+                ('sql_duration_seconds_total', 'Total waktu SQL per endpoint.', self.sql_seconds, '{:.6f}'),
+                ('sql_n_plus_one_total', 'Request dengan statement SQL yang berulang melewati ambang.', self.n_plus_one, '{}'),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for endpoint, value in sorted(values.items()):
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} {fmt.format(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def normalize(statement):
+    return re.sub(r'\s+', ' ', statement).strip()
+
+
+def init_instrumentation(app, db, metrics):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        stats = g.get('sql_stats') if has_request_context() else None
+        if stats is not None:
+            stats['count'] += 1
+            stats['seconds'] += elapsed
+            stats['statements'][normalize(statement)] += 1
+
+    def handle_error(context):
+        # Statement gagal tidak memicu after_cursor_execute; buang waktu mulainya
+        if context.connection is not None and context.connection.info.get('query_start'):
+            context.connection.info['query_start'].pop()
+
+    # Semua engine, termasuk bind `reports` yang dipakai halaman laporan
+    for engine in db.engines.values():
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+        event.listen(engine, 'handle_error', handle_error)
+
+    def started(sender, **extra):
+        g.request_start = time.perf_counter()
+        g.sql_stats = {'count': 0, 'seconds': 0.0, 'statements': Counter()}
+
+    def record(start, stats, endpoint, method, path, status):
+        elapsed = time.perf_counter() - start
+        repeated = [(statement, count) for statement, count in stats['statements'].items()
+                    if count > metrics.n_plus_one_threshold]
+        metrics.record(endpoint, method, status, elapsed, stats['count'], stats['seconds'], bool(repeated))
+        for statement, count in repeated:
+            app.logger.warning(f'Possible N+1 on {endpoint}: {count}x {statement[:200]}')
+        if metrics.slow_request_ms is not None and elapsed * 1000 >= metrics.slow_request_ms:
+            slow_logger.warning(f'{method} {path} {elapsed * 1000:.1f}ms '
+                                f'sql={stats["count"]} ({stats["seconds"] * 1000:.1f}ms)')
+
+    def finished(sender, response=None, status=None, **extra):
+        start = g.pop('request_start', None)
+        stats = g.get('sql_stats')
+        if start is None or stats is None:
+            return
+        args = (start, stats, request.endpoint or 'unknown', request.method, request.full_path,
+                status or response.status_code)
+        if response is not None and response.is_streamed:
+            # Body streaming (ekspor, NDJSON, stream_template) dihasilkan setelah sinyal ini;
+            # g.sql_stats tetap ada agar query selama streaming ikut terhitung
+            response.call_on_close(lambda: record(*args))
+            return
+        g.pop('sql_stats', None)
+        record(*args)
+
+    def failed(sender, exception, **extra):
+        finished(sender, status=500)
+
+    request_started.connect(started, app, weak=False)
+    request_finished.connect(finished, app, weak=False)
+    got_request_exception.connect(failed, app, weak=False)
@@ -0,0 +1,47 @@
+"""Perbarui skema database yang sudah ada tanpa kehilangan data.
+
+db.create_all() hanya membuat tabel yang belum ada, sehingga index dan
+constraint baru pada tabel lama perlu ditambahkan lewat skrip ini:
+
+    python migrate_db.py
+"""
+from sqlalchemy import text
+from models import db, Student, Attendance, AuditLog, create_summary_triggers
+from student_search import create_search_index
+
+
+def dedupe_attendance():
+    # Sisakan baris terakhir untuk setiap (student_id, tanggal) sebelum index unik dibuat
+    result = db.session.execute(text(
+        'DELETE FROM attendance WHERE id NOT IN '
+        '(SELECT MAX(id) FROM attendance GROUP BY student_id, tanggal)'
+    ))
+    db.session.commit()
+    return result.rowcount
+
+
+def create_indexes(table):
+    for index in table.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+
+
+def upgrade():
+    db.create_all()
+    removed = dedupe_attendance()
+    create_indexes(Student.__table__)
+    create_indexes(Attendance.__table__)
+    create_indexes(AuditLog.__table__)
+    create_search_index()
+    create_summary_triggers()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+    return removed
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        removed = upgrade()
+        print(f'Skema diperbarui, {removed} baris absensi duplikat dihapus.')
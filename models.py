@@ -1,10 +1,105 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-from sqlalchemy import event
+from datetime import datetime, date
+from collections import defaultdict
+from sqlalchemy import event, DDL
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import json
 
-db = SQLAlchemy()
+from sqlite_tuning import RoutingSession, lock_for_write
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Urutan status sesuai kolom rekap: Hadir, Alfa, Izin, Sakit
+STATUSES = ('H', 'A', 'I', 'S')
+
+def month_range(year, month):
+    start_date = date(year, month, 1)
+    if month == 12:
+        end_date = date(year + 1, 1, 1)
+    else:
+        end_date = date(year, month + 1, 1)
+    return start_date, end_date
+
+def totals_by_range(start_date, end_date, student_ids=None):
+    """Hitung total H/A/I/S semua siswa dalam satu query GROUP BY.
+
+    Mengembalikan dict {student_id: (hadir, alfa, izin, sakit)}; siswa tanpa
+    data kehadiran bernilai (0, 0, 0, 0).
+    """
+    query = db.session.query(Attendance.student_id, Attendance.status, db.func.count(Attendance.id)) \
+        .filter(Attendance.tanggal >= start_date, Attendance.tanggal < end_date)
+    if student_ids is not None:
+        query = query.filter(Attendance.student_id.in_(list(student_ids)))
+    counts = defaultdict(lambda: [0] * len(STATUSES))
+    for student_id, status, count in query.group_by(Attendance.student_id, Attendance.status):
+        if status in STATUSES:
+            counts[student_id][STATUSES.index(status)] = count
+    totals = defaultdict(lambda: (0,) * len(STATUSES))
+    totals.update({student_id: tuple(values) for student_id, values in counts.items()})
+    return totals
+
+def totals_by_month(year, month, student_ids=None):
+    """Total H/A/I/S per siswa untuk satu bulan, dibaca dari monthly_summary.
+
+    Trigger menjaga ringkasan tetap sesuai dengan tabel attendance, sehingga
+    pemeriksaan cukup memastikan ringkasan bulan itu ada bila datanya ada (dua
+    lookup index). Bila tidak cocok, misalnya database lama sebelum trigger
+    dipasang, total dihitung dari tabel attendance dan ringkasannya dibangun ulang.
+    """
+    start_date, end_date = month_range(year, month)
+    has_raw = db.session.query(Attendance.id) \
+        .filter(Attendance.tanggal >= start_date, Attendance.tanggal < end_date).first() is not None
+    has_summary = db.session.query(MonthlySummary.student_id) \
+        .filter_by(year=year, month=month).filter(MonthlySummary.total > 0).first() is not None
+    if has_raw != has_summary:
+        rebuild_monthly_summary(year, month)
+        return totals_by_range(start_date, end_date, student_ids)
+
+    query = db.session.query(MonthlySummary.student_id, MonthlySummary.status, MonthlySummary.total) \
+        .filter_by(year=year, month=month)
+    if student_ids is not None:
+        query = query.filter(MonthlySummary.student_id.in_(list(student_ids)))
+    counts = defaultdict(lambda: [0] * len(STATUSES))
+    for student_id, status, total in query:
+        if status in STATUSES:
+            counts[student_id][STATUSES.index(status)] = total
+    totals = defaultdict(lambda: (0,) * len(STATUSES))
+    totals.update({student_id: tuple(values) for student_id, values in counts.items()})
+    return totals
+
+def attendance_matrix(start_date=None, end_date=None, kelas=None):
+    """Matriks siswa x tanggal dari satu query GROUP BY (student_id, tanggal).
+
+    Mengembalikan (dates, students, counts, statuses): `dates` list tanggal
+    terurut, `students` list Student, `counts[i]` list int per tanggal untuk
+    siswa ke-i, dan `statuses[i]` string kode status ('-' bila tidak ada data).
+    """
+    query = db.session.query(Attendance.student_id, Attendance.tanggal,
+                             db.func.count(Attendance.id), db.func.max(Attendance.status))
+    students_query = Student.query
+    if start_date is not None:
+        query = query.filter(Attendance.tanggal >= start_date)
+    if end_date is not None:
+        query = query.filter(Attendance.tanggal <= end_date)
+    if kelas:
+        query = query.join(Student, Student.id == Attendance.student_id).filter(Student.kelas == kelas)
+        students_query = students_query.filter_by(kelas=kelas)
+    rows = query.group_by(Attendance.student_id, Attendance.tanggal).all()
+
+    dates = sorted({tanggal for _, tanggal, _, _ in rows})
+    date_index = {tanggal: i for i, tanggal in enumerate(dates)}
+    students = students_query.order_by(Student.id).all()
+    student_index = {student.id: i for i, student in enumerate(students)}
+    counts = [[0] * len(dates) for _ in students]
+    statuses = [['-'] * len(dates) for _ in students]
+    for student_id, tanggal, count, status in rows:
+        i = student_index.get(student_id)
+        if i is not None:
+            counts[i][date_index[tanggal]] = count
+            statuses[i][date_index[tanggal]] = status
+    return dates, students, counts, [''.join(row) for row in statuses]
 
 class Student(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -12,17 +107,23 @@ class Student(db.Model):
     kelas = db.Column(db.String(10))
     attendances = db.relationship('Attendance', backref='student', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_student_kelas', 'kelas', 'id'),
+    )
+
     def total_attendance_by_month(self, year, month):
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-        hadir = Attendance.query.filter_by(student_id=self.id, status='H').filter(Attendance.tanggal >= start_date).filter(Attendance.tanggal < end_date).count()
-        alfa = Attendance.query.filter_by(student_id=self.id, status='A').filter(Attendance.tanggal >= start_date).filter(Attendance.tanggal < end_date).count()
-        izin = Attendance.query.filter_by(student_id=self.id, status='I').filter(Attendance.tanggal >= start_date).filter(Attendance.tanggal < end_date).count()
-        sakit = Attendance.query.filter_by(student_id=self.id, status='S').filter(Attendance.tanggal >= start_date).filter(Attendance.tanggal < end_date).count()
-        return hadir, alfa, izin, sakit
+        # Untuk banyak siswa sekaligus gunakan totals_by_month()
+        return totals_by_month(year, month, [self.id])[self.id]
+
+def class_students(kelas=None):
+    """Siswa satu kelas (memakai ix_student_kelas), atau semua siswa bila `kelas` kosong."""
+    query = Student.query
+    if kelas:
+        query = query.filter_by(kelas=kelas)
+    return query.order_by(Student.id).all()
+
+def kelas_choices():
+    return [kelas for kelas, in db.session.query(Student.kelas).distinct().order_by(Student.kelas)]
 
 class Attendance(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -30,6 +131,133 @@ class Attendance(db.Model):
     tanggal = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(1), nullable=False)
 
+    # Index unik (student_id, tanggal) sekaligus melayani filter per siswa per tanggal.
+    # Database lama diperbarui oleh migrate_db.upgrade() (`flask --app app upgrade-db`).
+    __table_args__ = (
+        db.Index('ix_attendance_tanggal', 'tanggal'),
+        db.Index('uq_attendance_student_tanggal', 'student_id', 'tanggal', unique=True),
+        db.Index('ix_attendance_student_status_tanggal', 'student_id', 'status', 'tanggal'),
+    )
+
+class MonthlySummary(db.Model):
+    # Jumlah status per siswa per bulan, dijaga oleh trigger SQLite pada tabel attendance
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(1), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_monthly_summary_year_month', 'year', 'month'),
+    )
+
+_SUMMARY_INCREMENT = (
+    'INSERT INTO monthly_summary (student_id, year, month, status, total) '
+    'VALUES (new.student_id, CAST(substr(new.tanggal, 1, 4) AS INTEGER), '
+    'CAST(substr(new.tanggal, 6, 2) AS INTEGER), new.status, 1) '
+    'ON CONFLICT (student_id, year, month, status) DO UPDATE SET total = total + 1;'
+)
+_SUMMARY_DECREMENT = (
+    'UPDATE monthly_summary SET total = total - 1 WHERE student_id = old.student_id '
+    'AND year = CAST(substr(old.tanggal, 1, 4) AS INTEGER) '
+    'AND month = CAST(substr(old.tanggal, 6, 2) AS INTEGER) AND status = old.status;'
+)
+# monthly_summary ikut berubah di statement yang sama dengan baris attendance,
+# sehingga penyimpanan bersamaan (atau UPDATE/DELETE langsung) tidak bisa membuatnya menyimpang
+SUMMARY_TRIGGERS = [
+    f'CREATE TRIGGER IF NOT EXISTS attendance_summary_ai AFTER INSERT ON attendance BEGIN {_SUMMARY_INCREMENT} END',
+    f'CREATE TRIGGER IF NOT EXISTS attendance_summary_ad AFTER DELETE ON attendance BEGIN {_SUMMARY_DECREMENT} END',
+    f'CREATE TRIGGER IF NOT EXISTS attendance_summary_au AFTER UPDATE OF student_id, tanggal, status ON attendance '
+    f'BEGIN {_SUMMARY_DECREMENT} {_SUMMARY_INCREMENT} END',
+]
+for _statement in SUMMARY_TRIGGERS:
+    event.listen(Attendance.__table__, 'after_create', DDL(_statement))
+
+def create_summary_triggers():
+    """Pasang trigger monthly_summary pada database lama.
+
+    Tabel yang dibuat db.create_all sudah mendapat trigger. Bila trigger baru
+    dipasang, ringkasan yang ada dibangun ulang dari tabel attendance.
+    """
+    installed = db.session.execute(db.text(
+        "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'attendance_summary_%'"
+    )).scalar()
+    for statement in SUMMARY_TRIGGERS:
+        db.session.execute(db.text(statement))
+    db.session.commit()
+    if installed < len(SUMMARY_TRIGGERS):
+        rebuild_monthly_summary()
+
+def rebuild_monthly_summary(year=None, month=None):
+    """Bangun ulang monthly_summary dari tabel attendance.
+
+    Ditulis lewat koneksi tersendiri agar objek di db.session tidak ikut
+    di-expire (yang akan memicu satu SELECT per siswa saat template dirender).
+    """
+    year_col = db.extract('year', Attendance.tanggal)
+    month_col = db.extract('month', Attendance.tanggal)
+    select = db.select(Attendance.student_id, year_col, month_col, Attendance.status, db.func.count(Attendance.id)) \
+        .group_by(Attendance.student_id, year_col, month_col, Attendance.status)
+    delete = db.delete(MonthlySummary)
+    if year is not None:
+        if month is not None:
+            start_date, end_date = month_range(year, month)
+            delete = delete.filter_by(year=year, month=month)
+        else:
+            start_date, end_date = date(year, 1, 1), date(year + 1, 1, 1)
+            delete = delete.filter_by(year=year)
+        select = select.filter(Attendance.tanggal >= start_date, Attendance.tanggal < end_date)
+    with db.engine.begin() as connection:
+        connection.execute(delete)
+        connection.execute(db.insert(MonthlySummary).from_select(
+            ['student_id', 'year', 'month', 'status', 'total'], select))
+
+class AbsenceNotification(db.Model):
+    # Ambang alfa terakhir yang sudah dikirim ke Telegram untuk tiap siswa
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), primary_key=True)
+    absences = db.Column(db.Integer, nullable=False)
+    notified_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+def save_attendance(tanggal, statuses, user_id=None):
+    """Simpan status kehadiran satu hari dalam satu transaksi.
+
+    `statuses` berisi {student_id: status}. Hanya baris yang berubah dari data
+    tersimpan yang di-upsert, lalu dicatat sebagai satu entri audit.
+    Status lama dibaca setelah lock tulis diambil, sehingga dua penyimpanan
+    bersamaan untuk hari yang sama tidak memakai data lama yang sama.
+    Mengembalikan dict {student_id: (status_lama, status_baru)}.
+    """
+    lock_for_write(db.session, Attendance.__table__)
+    existing = dict(db.session.query(Attendance.student_id, Attendance.status)
+                    .filter(Attendance.tanggal == tanggal)
+                    .filter(Attendance.student_id.in_(list(statuses))))
+    changed = {student_id: (existing.get(student_id), status)
+               for student_id, status in statuses.items() if existing.get(student_id) != status}
+    if not changed:
+        db.session.commit()  # lepaskan lock tulis
+        return changed
+
+    stmt = sqlite_insert(Attendance.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['student_id', 'tanggal'],
+        set_={'status': stmt.excluded.status},
+    )
+    db.session.execute(stmt, [
+        {'student_id': student_id, 'tanggal': tanggal, 'status': new}
+        for student_id, (old, new) in changed.items()
+    ])
+    db.session.add(AuditLog(
+        action='bulk_upsert',
+        model=Attendance.__tablename__,
+        changes=json.dumps({
+            'tanggal': str(tanggal),
+            'status': {str(student_id): [old, new] for student_id, (old, new) in changed.items()},
+        }),
+        user_id=user_id,
+    ))
+    db.session.commit()
+    return changed
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(100), unique=True, nullable=False)
@@ -57,5 +285,12 @@ class AuditLog(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
 
+    __table_args__ = (
+        db.Index('ix_audit_log_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_audit_log_model_model_id', 'model', 'model_id', 'timestamp'),
+        db.Index('ix_audit_log_user_id', 'user_id', 'timestamp'),
+        db.Index('ix_audit_log_action', 'action', 'timestamp'),
+    )
+
     def __repr__(self):
         return f'<AuditLog {self.action} on {self.model} id {self.model_id}>'
@@ -0,0 +1,169 @@
+"""Notifikasi Telegram untuk siswa yang sering absen.
+
+Pengiriman dilakukan oleh thread latar belakang sehingga request simpan
+absensi tidak menunggu jaringan. Setiap siswa hanya diberi notifikasi sekali
+per ambang batas (misalnya 3, 5, 10 kali alfa); ambang terakhir yang sudah
+dikirim disimpan di tabel absence_notification.
+"""
+import asyncio
+import inspect
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, Student, Attendance, AbsenceNotification
+
+logger = logging.getLogger(__name__)
+
+
+class FakeBot:
+    """Pengganti telegram.Bot untuk pengujian tanpa koneksi internet."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class TelegramBot:
+    """telegram.Bot yang baru dibuat (dan diimpor) saat pesan pertama dikirim."""
+
+    def __init__(self, token):
+        self.token = token
+        self.bot = None
+
+    def send_message(self, chat_id, text):
+        if self.bot is None:
+            from telegram import Bot
+            self.bot = Bot(token=self.token)
+        return self.bot.send_message(chat_id=chat_id, text=text)
+
+
+class NotificationDispatcher:
+    def __init__(self, app, bot, batch_size=20, rate_limit=1.0):
+        self.app = app
+        self.bot = bot
+        self.batch_size = batch_size
+        self.min_interval = 1.0 / rate_limit if rate_limit else 0
+        self.queue = queue.Queue()
+        self.pending = set()
+        self.last_sent = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.loop = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='telegram-notifier', daemon=True)
+                self.thread.start()
+
+    def stop(self, timeout=10):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+    def enqueue(self, chat_id, student_id, level, message):
+        key = (student_id, level)
+        with self.lock:
+            if key in self.pending:
+                return False
+            self.pending.add(key)
+        self.queue.put((chat_id, student_id, level, message))
+        self.start()
+        return True
+
+    def _next_batch(self):
+        item = self.queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        while len(batch) < self.batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _throttle(self, chat_id):
+        wait = self.last_sent.get(chat_id, 0) + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_sent[chat_id] = time.monotonic()
+
+    def _send(self, chat_id, message):
+        result = self.bot.send_message(chat_id=chat_id, text=message)
+        # python-telegram-bot >= 20 mengembalikan coroutine
+        if inspect.isawaitable(result):
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(result)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            sent = []
+            for chat_id, student_id, level, message in batch:
+                self._throttle(chat_id)
+                try:
+                    self._send(chat_id, message)
+                    sent.append({'student_id': student_id, 'absences': level, 'notified_at': datetime.utcnow()})
+                except Exception:
+                    logger.exception('Failed to send Telegram notification for student %s', student_id)
+            try:
+                if sent:
+                    with self.app.app_context():
+                        mark_notified(sent)
+            finally:
+                with self.lock:
+                    self.pending.difference_update((student_id, level) for _, student_id, level, _ in batch)
+
+
+def mark_notified(rows):
+    stmt = sqlite_insert(AbsenceNotification.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['student_id'],
+        set_={'absences': stmt.excluded.absences, 'notified_at': stmt.excluded.notified_at},
+    )
+    db.session.execute(stmt, rows)
+    db.session.commit()
+
+
+def absence_crossings(thresholds):
+    """Siswa yang mencapai ambang batas alfa baru, dalam satu query agregat.
+
+    Mengembalikan list (student_id, nama, jumlah_alfa, ambang).
+    """
+    thresholds = sorted(thresholds)
+    absences = db.func.count(Attendance.id)
+    rows = db.session.query(Student.id, Student.nama, absences, AbsenceNotification.absences) \
+        .join(Attendance, Attendance.student_id == Student.id) \
+        .outerjoin(AbsenceNotification, AbsenceNotification.student_id == Student.id) \
+        .filter(Attendance.status == 'A') \
+        .group_by(Student.id) \
+        .having(absences >= thresholds[0])
+    crossings = []
+    for student_id, nama, count, notified in rows:
+        level = max(t for t in thresholds if t <= count)
+        if notified is None or level > notified:
+            crossings.append((student_id, nama, count, level))
+    return crossings
+
+
+def notify_absences(dispatcher, chat_id, thresholds):
+    queued = 0
+    for student_id, nama, absences, level in absence_crossings(thresholds):
+        if dispatcher.enqueue(chat_id, student_id, level, f'Siswa {nama} telah absen sebanyak {absences} kali.'):
+            queued += 1
+    return queued
@@ -0,0 +1,196 @@
+"""Pembuatan PDF rekap di latar belakang.
+
+HTML rekap dirender di dalam request (cepat), sedangkan konversi ke PDF
+dijalankan di process pool terbatas. File hasil disimpan di disk dengan nama
+yang diturunkan dari isi HTML, sehingga permintaan identik memakai job dan
+file yang sama. Status job juga disimpan di disk sebagai file penanda di
+samping PDF-nya (`<id>.pending` selama dibuat, `<id>.failed` bila gagal),
+sehingga worker mana pun bisa menjawab status dan unduhan. Penanda `.pending`
+berisi host dan PID pemiliknya; penanda milik proses yang sudah mati atau yang
+lebih lama dari `timeout` dianggap terbengkalai dan job-nya dijadwalkan ulang. Bila wkhtmltopdf
+tidak tersedia, PDF dibuat dengan matplotlib sebagai fallback.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+JOB_ID_PATTERN = re.compile(r'^\d{4}-\d{1,2}-[0-9a-f]{16}$')
+ROWS_PER_PAGE = 35
+
+
+def render_table_pdf(table):
+    """Render tabel rekap ke PDF tanpa wkhtmltopdf."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    buffer = io.BytesIO()
+    rows = table['rows'] or [[''] * len(table['columns'])]
+    with PdfPages(buffer) as pdf:
+        for start in range(0, len(rows), ROWS_PER_PAGE):
+            fig = Figure(figsize=(8.27, 11.69))  # A4
+            ax = fig.add_subplot(111)
+            ax.axis('off')
+            ax.set_title(table['title'], loc='left')
+            cells = ax.table(cellText=rows[start:start + ROWS_PER_PAGE], colLabels=table['columns'], loc='upper center')
+            cells.auto_set_font_size(False)
+            cells.set_fontsize(8)
+            pdf.savefig(fig)
+    return buffer.getvalue()
+
+
+def render_pdf(html, table, wkhtmltopdf):
+    try:
+        import pdfkit
+        config = pdfkit.configuration(wkhtmltopdf=wkhtmltopdf)
+        return pdfkit.from_string(html, False, configuration=config)
+    except (ImportError, OSError):
+        return render_table_pdf(table)
+
+
+def build_pdf(path, html, table, wkhtmltopdf):
+    pdf = render_pdf(html, table, wkhtmltopdf)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(pdf)
+    os.replace(tmp_path, path)
+    return path
+
+
+class PdfJobQueue:
+    def __init__(self, directory, wkhtmltopdf, max_workers=2, retention=24 * 3600, timeout=300):
+        self.directory = directory
+        self.wkhtmltopdf = wkhtmltopdf
+        self.max_workers = max_workers
+        self.retention = retention
+        self.timeout = timeout
+        self.executor = None
+        self.jobs = {}
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, job_id, suffix='.pdf'):
+        return os.path.join(self.directory, f'{job_id}{suffix}')
+
+    def submit(self, year, month, html, table, download_name=None):
+        job_id = f'{year}-{month}-{hashlib.sha1(html.encode()).hexdigest()[:16]}'
+        self.cleanup()
+        if download_name:
+            # Nama unduhan (misalnya dengan kelas) disimpan di samping PDF untuk semua worker
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                f.write(download_name)
+            os.replace(tmp_path, self.path(job_id, '.name'))
+        if os.path.exists(self.path(job_id)):
+            return job_id
+        if not self._claim(job_id):
+            return job_id
+        self._remove(job_id, '.failed')
+        with self.lock:
+            if self.executor is None:
+                # Worker dibuat oleh forkserver, bukan fork dari proses web yang sudah multi-thread
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                    mp_context=multiprocessing.get_context('forkserver'))
+            try:
+                future = self.executor.submit(build_pdf, self.path(job_id), html, table, self.wkhtmltopdf)
+            except Exception:
+                self._remove(job_id, '.pending')
+                raise
+            self.jobs[job_id] = future
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return job_id
+
+    def _claim(self, job_id):
+        """Buat penanda `.pending`; False bila job sedang dibuat proses lain yang masih hidup."""
+        for _ in range(2):
+            try:
+                # Dibuat eksklusif: job yang sedang dibuat worker lain tidak diulang
+                fd = os.open(self.path(job_id, '.pending'), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._abandoned(job_id):
+                    return False
+                self._remove(job_id, '.pending')
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(f'{socket.gethostname()} {os.getpid()}')
+            return True
+        return False
+
+    def _abandoned(self, job_id):
+        path = self.path(job_id, '.pending')
+        try:
+            if time.time() - os.path.getmtime(path) > self.timeout:
+                return True
+            with open(path) as f:
+                owner = f.read().split()
+        except FileNotFoundError:
+            return True
+        if len(owner) != 2 or not owner[1].isdigit() or owner[0] != socket.gethostname() \
+                or int(owner[1]) == os.getpid():
+            return False
+        try:
+            os.kill(int(owner[1]), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def _finish(self, job_id, future):
+        error = future.exception()
+        if error is not None:
+            with open(self.path(job_id, '.failed'), 'w') as f:
+                f.write(repr(error))
+        self._remove(job_id, '.pending')
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+    def _remove(self, job_id, suffix):
+        try:
+            os.remove(self.path(job_id, suffix))
+        except FileNotFoundError:
+            pass
+
+    def download_name(self, job_id):
+        try:
+            with open(self.path(job_id, '.name')) as f:
+                return f.read()
+        except FileNotFoundError:
+            year, month, _ = job_id.split('-')
+            return f'rekap_absensi_{year}_{month}.pdf'
+
+    def status(self, job_id):
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        if os.path.exists(self.path(job_id)):
+            return 'done'
+        if os.path.exists(self.path(job_id, '.pending')) and not self._abandoned(job_id):
+            with self.lock:
+                future = self.jobs.get(job_id)
+            return 'running' if future is not None and future.running() else 'pending'
+        if os.path.exists(self.path(job_id, '.failed')) or os.path.exists(self.path(job_id, '.pending')):
+            # Job terbengkalai dilaporkan gagal; permintaan berikutnya menjadwalkannya ulang
+            return 'failed'
+        return None
+
+    def cleanup(self):
+        cutoff = time.time() - self.retention
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
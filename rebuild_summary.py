@@ -0,0 +1,17 @@
+"""Isi ulang tabel monthly_summary dari data absensi yang sudah ada.
+
+    python rebuild_summary.py              # semua bulan
+    python rebuild_summary.py 2024         # satu tahun
+    python rebuild_summary.py 2024 6       # satu bulan
+"""
+import sys
+
+from app import create_app
+from models import rebuild_monthly_summary
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    app = create_app()
+    with app.app_context():
+        rebuild_monthly_summary(*args)
+        print('Ringkasan bulanan selesai dibangun ulang.')
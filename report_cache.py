@@ -0,0 +1,166 @@
+"""Cache respons halaman rekap (HTML dan PDF).
+
+Kunci cache terdiri dari (view, tahun, bulan, ekstra, kelas, role). Penulisan
+absensi menghapus kunci bulan yang terdampak saja (dan bila kelasnya
+diketahui, hanya kunci kelas itu serta rekap semua kelas), sedangkan
+perubahan data siswa menghapus seluruh cache karena siswa muncul di setiap
+bulan.
+
+Backend `lru` menyimpan di memori proses: invalidasi hanya sampai ke worker
+yang menangani penulisan, sehingga worker lain bisa menyajikan halaman lama
+sampai entri kedaluwarsa (`REPORT_CACHE_TTL`). Backend ini hanya tepat untuk
+satu worker. Backend `filesystem` menyimpan di direktori yang dipakai bersama
+oleh semua worker sehingga invalidasi berlaku untuk semuanya.
+"""
+import glob
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import request, session, make_response
+from flask_login import current_user
+
+ReportKey = namedtuple('ReportKey', 'view year month extra kelas role')
+
+
+class CacheEntry:
+    def __init__(self, body, mimetype, headers):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def to_response(self):
+        response = make_response(self.body)
+        response.mimetype = self.mimetype
+        response.headers.update(self.headers)
+        response.set_etag(self.etag)
+        response.last_modified = self.last_modified
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+
+class LRUCache:
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires is not None and expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self.lock:
+            self.entries[key] = (expires, entry)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate_month(self, year, month, kelas=None):
+        with self.lock:
+            for key in [k for k in self.entries if (k.year, k.month) == (year, month)
+                        and (kelas is None or k.kelas in (kelas, ''))]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def kelas_dir(kelas):
+    return 'k-' + hashlib.sha1(kelas.encode()).hexdigest()[:12]
+
+
+class FileSystemCache:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _month_dir(self, view, year, month):
+        return os.path.join(self.directory, view, f'{year:04d}-{month:02d}')
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(tuple(key)).encode()).hexdigest()
+        return os.path.join(self._month_dir(key.view, key.year, key.month), kelas_dir(key.kelas), f'{digest}.pkl')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def set(self, key, entry):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def invalidate_month(self, year, month, kelas=None):
+        month_dirs = glob.glob(self._month_dir('*', year, month))
+        if kelas is None:
+            paths = month_dirs
+        else:
+            paths = [os.path.join(path, kelas_dir(k)) for path in month_dirs for k in (kelas, '')]
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, '*')):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def create_cache(config):
+    if config.get('REPORT_CACHE_TYPE') == 'filesystem':
+        return FileSystemCache(config['REPORT_CACHE_DIR'])
+    return LRUCache(config.get('REPORT_CACHE_SIZE', 256), config.get('REPORT_CACHE_TTL'))
+
+
+def cached_report(cache, view, period):
+    """Cache respons GET dari view rekap.
+
+    `period` dipanggil di dalam request dan mengembalikan (tahun, bulan, ekstra).
+    Respons dilayani dengan ETag/Last-Modified sehingga klien bisa revalidasi.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            # Halaman yang akan menampilkan pesan flash milik user tidak di-cache
+            if request.method != 'GET' or '_flashes' in session:
+                return f(*args, **kwargs)
+            year, month, extra = period()
+            role = current_user.role if current_user.is_authenticated else None
+            key = ReportKey(view, year, month, extra, request.args.get('kelas', ''), role)
+            entry = cache.get(key)
+            if entry is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                headers = {k: v for k, v in response.headers.items() if k == 'Content-Disposition'}
+                entry = CacheEntry(response.get_data(), response.mimetype, headers)
+                cache.set(key, entry)
+            return entry.to_response().make_conditional(request)
+        return wrapper
+    return decorator
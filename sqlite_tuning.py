@@ -0,0 +1,124 @@
+"""Pengaturan engine SQLite untuk produksi.
+
+Koneksi tulis memakai WAL, busy_timeout dan synchronous=NORMAL sehingga
+pembaca tidak memblokir penulis dan penulis yang bersamaan menunggu alih-alih
+langsung gagal dengan "database is locked". Halaman laporan membaca lewat
+bind terpisah `reports` yang membuka file yang sama dalam mode read-only
+(`mode=ro`) dengan pool koneksinya sendiri.
+"""
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+REPORT_BIND = 'reports'
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,  # milidetik
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -32000,  # negatif berarti KiB, jadi sekitar 32 MB per koneksi
+}
+# journal_mode dan synchronous tidak bisa/perlu diubah dari koneksi read-only
+READ_ONLY_SKIP = ('journal_mode', 'synchronous')
+
+
+def is_file_database(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def read_only_uri(uri):
+    """URI read-only untuk file SQLite yang sama, atau None untuk database in-memory."""
+    if not is_file_database(uri):
+        return None
+    url = make_url(uri)
+    if url.query.get('uri'):
+        return url.update_query_dict({'mode': 'ro'}).render_as_string(hide_password=False)
+    return url.set(database=f'file:{url.database}', query={**url.query, 'mode': 'ro', 'uri': 'true'}) \
+        .render_as_string(hide_password=False)
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS untuk database file; in-memory memakai default Flask-SQLAlchemy."""
+    if not is_file_database(config['SQLALCHEMY_DATABASE_URI']):
+        return {}
+    return {
+        'pool_size': config['SQLITE_POOL_SIZE'],
+        'max_overflow': config['SQLITE_MAX_OVERFLOW'],
+        'pool_timeout': 30,
+        # Koneksi dipakai bergantian oleh thread request melalui pool
+        'connect_args': {'check_same_thread': False, 'timeout': config['SQLITE_PRAGMAS']['busy_timeout'] / 1000},
+    }
+
+
+def set_pragmas(engine, pragmas, read_only=False):
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if read_only and name in READ_ONLY_SKIP:
+                continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only = ON')
+        cursor.close()
+
+
+def init_sqlite(db, config):
+    """Pasang pragma pada semua engine SQLite milik `db`. Dipanggil di dalam app context."""
+    for key, engine in db.engines.items():
+        if engine.dialect.name != 'sqlite':
+            continue
+        set_pragmas(engine, config['SQLITE_PRAGMAS'], read_only=key == REPORT_BIND)
+        # Engine dibuat sebelum listener terpasang; buang koneksi lama agar pragma berlaku
+        engine.dispose()
+
+
+class RoutingSession(Session):
+    """Session yang mengarahkan query baca ke bind `reports` selama mode read-only aktif."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('read_only') and not self._flushing:
+            engine = self._db.engines.get(REPORT_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def lock_for_write(session, table):
+    """Buka transaksi tulis sebelum membaca data yang akan diubah (setara BEGIN IMMEDIATE).
+
+    pysqlite baru mengirim BEGIN tepat sebelum statement tulis pertama, sehingga
+    SELECT sebelumnya berjalan di luar transaksi dan bisa didahului penulis lain.
+    UPDATE kosong ini mengambil lock tulis (menunggu sesuai busy_timeout); semua
+    pembacaan sesudahnya sampai commit melihat data terbaru.
+    """
+    session.execute(text(f'UPDATE {table.name} SET rowid = rowid WHERE 0'))
+
+
+@contextmanager
+def read_only(session):
+    previous = session.info.get('read_only', False)
+    session.info['read_only'] = True
+    try:
+        yield
+    finally:
+        session.info['read_only'] = previous
+
+
+def read_only_view(session):
+    """Decorator view: request GET membaca dari pool read-only."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            with read_only(session):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
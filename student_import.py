@@ -0,0 +1,91 @@
+"""Impor data siswa dari file Excel/CSV.
+
+File dibaca langsung dari memori, divalidasi per kolom dengan pandas (bukan
+per baris), lalu disisipkan per chunk dengan INSERT executemany. Aturan
+validasi sama dengan StudentForm: Nama 2-50 karakter dan unik, Kelas 1-20
+karakter.
+"""
+import io
+import json
+
+import pandas as pd
+
+from models import db, Student, AuditLog
+
+REQUIRED_COLUMNS = ('Nama', 'Kelas')
+NAMA_LENGTH = (2, 50)
+KELAS_LENGTH = (1, 20)
+CSV_CHUNK_SIZE = 5000
+
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.valid = 0
+        self.errors = []  # (nomor baris di file, pesan)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def read_frames(fileobj, filename):
+    data = io.BytesIO(fileobj.read())
+    if filename.lower().endswith('.csv'):
+        yield from pd.read_csv(data, dtype=str, chunksize=CSV_CHUNK_SIZE, keep_default_na=False)
+    else:
+        yield pd.read_excel(data, dtype=str, keep_default_na=False)
+
+
+def validate(df, first_row, existing, seen, result):
+    """Kembalikan baris valid dari `df` dan catat error ke `result`."""
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f'Kolom tidak ditemukan: {", ".join(missing)}')
+
+    df = df[list(REQUIRED_COLUMNS)].apply(lambda column: column.astype(str).str.strip())
+    df.index = range(first_row, first_row + len(df))
+    nama_len = df['Nama'].str.len()
+    kelas_len = df['Kelas'].str.len()
+    checks = [
+        (~nama_len.between(*NAMA_LENGTH), f'Nama harus {NAMA_LENGTH[0]}-{NAMA_LENGTH[1]} karakter'),
+        (~kelas_len.between(*KELAS_LENGTH), f'Kelas harus {KELAS_LENGTH[0]}-{KELAS_LENGTH[1]} karakter'),
+        (df['Nama'].isin(existing), 'Nama siswa sudah ada'),
+        (df['Nama'].isin(seen) | df['Nama'].duplicated(), 'Nama siswa duplikat di dalam file'),
+    ]
+    invalid = pd.Series(False, index=df.index)
+    for mask, message in checks:
+        mask = mask & ~invalid
+        result.errors.extend((row, message) for row in df.index[mask])
+        invalid |= mask
+    valid = df[~invalid]
+    seen.update(valid['Nama'])
+    return valid
+
+
+def import_students(fileobj, filename, dry_run=False, chunk_size=1000, user_id=None):
+    result = ImportResult()
+    existing = {nama for nama, in db.session.query(Student.nama)}
+    seen = set()
+    first_row = 2  # baris 1 adalah header
+    rows = []
+    for df in read_frames(fileobj, filename):
+        valid = validate(df, first_row, existing, seen, result)
+        first_row += len(df)
+        rows.extend({'nama': nama, 'kelas': kelas} for nama, kelas in zip(valid['Nama'], valid['Kelas']))
+    result.errors.sort()
+    result.valid = len(rows)
+    if dry_run or not rows:
+        return result
+
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(Student.__table__.insert(), rows[start:start + chunk_size])
+    db.session.add(AuditLog(
+        action='bulk_insert',
+        model=Student.__tablename__,
+        changes=json.dumps({'source': filename, 'count': len(rows)}),
+        user_id=user_id,
+    ))
+    db.session.commit()
+    result.inserted = len(rows)
+    return result
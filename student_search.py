@@ -0,0 +1,127 @@
+"""Pencarian dan paginasi daftar siswa.
+
+Pencarian memakai tabel virtual SQLite FTS5 `student_fts` (tokenizer trigram,
+sehingga potongan kata seperti "ant" cocok dengan "Santoso"). Tabel ini
+dijaga sinkron dengan tabel student oleh trigger, termasuk untuk insert
+massal. Bila FTS5 tidak tersedia atau kata kunci kurang dari 3 karakter,
+pencarian kembali memakai LIKE.
+
+Paginasi memakai keyset pada Student.id dengan cursor token, tanpa OFFSET
+dan tanpa COUNT(*).
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from models import db, Student
+
+FTS_TABLE = 'student_fts'
+FTS_MIN_LENGTH = 3  # panjang minimum untuk tokenizer trigram
+FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "nama, kelas, content='student', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS student_fts_ai AFTER INSERT ON student BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, nama, kelas) VALUES (new.id, new.nama, new.kelas); END",
+    f"CREATE TRIGGER IF NOT EXISTS student_fts_ad AFTER DELETE ON student BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nama, kelas) VALUES ('delete', old.id, old.nama, old.kelas); END",
+    f"CREATE TRIGGER IF NOT EXISTS student_fts_au AFTER UPDATE ON student BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nama, kelas) VALUES ('delete', old.id, old.nama, old.kelas); "
+    f"INSERT INTO {FTS_TABLE}(rowid, nama, kelas) VALUES (new.id, new.nama, new.kelas); END",
+]
+
+Page = namedtuple('Page', 'items prev_cursor next_cursor')
+
+_fts_enabled = {}
+
+
+def create_search_index():
+    """Buat tabel FTS beserta trigger bila belum ada. False bila FTS5 tidak tersedia."""
+    _fts_enabled.pop(str(db.engine.url), None)
+    exists = fts_enabled()
+    try:
+        for statement in FTS_DDL:
+            db.session.execute(text(statement))
+        if not exists:
+            rebuild_search_index()
+        db.session.commit()
+    except OperationalError:
+        db.session.rollback()
+        return False
+    _fts_enabled.pop(str(db.engine.url), None)
+    return True
+
+
+def rebuild_search_index():
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def fts_enabled():
+    key = str(db.engine.url)
+    if key not in _fts_enabled:
+        _fts_enabled[key] = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+        ).first() is not None
+    return _fts_enabled[key]
+
+
+def fts_match(query):
+    # Kata kunci dijadikan satu frasa agar operator FTS dari input user tidak diproses
+    return '"' + query.replace('"', '""') + '"'
+
+
+def search_filter(query):
+    if len(query) >= FTS_MIN_LENGTH and fts_enabled():
+        matches = text(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match') \
+            .bindparams(match=fts_match(query))
+        return Student.id.in_(matches)
+    return Student.nama.ilike(f'%{query}%') | Student.kelas.ilike(f'%{query}%')
+
+
+def search_students(query, limit=10):
+    """Siswa yang cocok dengan `query`, diurutkan berdasarkan relevansi bila memakai FTS."""
+    if len(query) >= FTS_MIN_LENGTH and fts_enabled():
+        rows = db.session.execute(
+            text(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match ORDER BY rank LIMIT :limit'),
+            {'match': fts_match(query), 'limit': limit},
+        ).scalars().all()
+        students = {student.id: student for student in Student.query.filter(Student.id.in_(rows))}
+        return [students[student_id] for student_id in rows if student_id in students]
+    return Student.query.filter(search_filter(query)).order_by(Student.nama).limit(limit).all()
+
+
+def encode_cursor(student_id):
+    return base64.urlsafe_b64encode(json.dumps({'id': student_id}).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        return int(data['id'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+
+def keyset_page(query, after=None, before=None, per_page=10):
+    if before is not None:
+        rows = query.filter(Student.id < before).order_by(Student.id.desc()).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after is not None:
+            query = query.filter(Student.id > after)
+        rows = query.order_by(Student.id).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = after is not None
+    return Page(
+        items,
+        encode_cursor(items[0].id) if items and has_prev else None,
+        encode_cursor(items[-1].id) if items and has_next else None,
+    )
@@ -0,0 +1,32 @@
+"""Blueprint aplikasi: auth, attendance, students, api dan reports.
+
+Helper yang dipakai lebih dari satu blueprint ada di modul ini.
+"""
+from datetime import datetime
+
+from flask import current_app, request
+
+from extensions import report_cache, chart_cache, notifier
+from notifications import notify_absences
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def selected_kelas():
+    return request.values.get('kelas', '').strip() or None
+
+
+def invalidate_reports(tanggal, kelas=None):
+    report_cache.invalidate_month(tanggal.year, tanggal.month, kelas)
+    chart_cache.invalidate_date(tanggal, kelas)
+
+
+def clear_reports():
+    report_cache.clear()
+    chart_cache.clear()
+
+
+def check_absence_and_notify():
+    return notify_absences(notifier, current_app.config['TELEGRAM_CHAT_ID'], current_app.config['ABSENCE_THRESHOLDS'])
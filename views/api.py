@@ -0,0 +1,161 @@
+import json
+from datetime import datetime
+
+from flask import Blueprint, current_app, request, jsonify, abort, Response, stream_with_context
+from flask_login import login_required, current_user
+from flask_restful import Api, Resource
+
+from extensions import walikelas_permission, sekretaris_permission
+from models import db, Student, Attendance, STATUSES, totals_by_month, save_attendance, attendance_matrix
+from sqlite_tuning import read_only_view
+from student_search import keyset_page, decode_cursor
+from views import parse_date, invalidate_reports, check_absence_and_notify
+
+bp = Blueprint('api', __name__)
+api = Api(bp)
+
+# Endpoint API untuk mengambil data siswa
+STUDENT_FIELDS = ('id', 'nama', 'kelas', 'total_kehadiran')
+API_MAX_LIMIT = 500
+API_STREAM_BATCH = 500
+
+
+def student_records(rows, fields, year, month):
+    totals = totals_by_month(year, month, [row.id for row in rows]) if 'total_kehadiran' in fields else None
+    for row in rows:
+        record = {'id': row.id, 'nama': row.nama, 'kelas': row.kelas}
+        if totals is not None:
+            record['total_kehadiran'] = totals[row.id]
+        yield {field: record[field] for field in fields}
+
+
+class StudentAPI(Resource):
+    def get(self, student_id=None):
+        now = datetime.now()
+        if student_id:
+            student = Student.query.get_or_404(student_id)
+            return jsonify({
+                'id': student.id,
+                'nama': student.nama,
+                'kelas': student.kelas,
+                'total_kehadiran': student.total_attendance_by_month(now.year, now.month)
+            })
+
+        fields = [field for field in request.args.get('fields', ','.join(STUDENT_FIELDS)).split(',') if field]
+        if not fields or any(field not in STUDENT_FIELDS for field in fields):
+            abort(400)
+        query = Student.query
+        if request.args.get('kelas'):
+            query = query.filter_by(kelas=request.args['kelas'])
+
+        limit = request.args.get('limit', type=int)
+        if limit is not None:
+            page = keyset_page(query, after=decode_cursor(request.args.get('cursor')), per_page=max(1, min(limit, API_MAX_LIMIT)))
+            return jsonify({
+                'items': list(student_records(page.items, fields, now.year, now.month)),
+                'next_cursor': page.next_cursor
+            })
+
+        # Tanpa limit: seluruh siswa dikirim bertahap per batch keyset, sebagai NDJSON atau array JSON
+        ndjson = request.args.get('format') == 'ndjson'
+        rows = query.with_entities(Student.id, Student.nama, Student.kelas).order_by(Student.id)
+
+        def batches():
+            last_id = 0
+            while True:
+                batch = rows.filter(Student.id > last_id).limit(API_STREAM_BATCH).all()
+                if not batch:
+                    return
+                yield batch
+                last_id = batch[-1].id
+
+        def generate():
+            first = True
+            if not ndjson:
+                yield '['
+            for batch in batches():
+                for record in student_records(batch, fields, now.year, now.month):
+                    if ndjson:
+                        yield json.dumps(record) + '\n'
+                    else:
+                        yield ('' if first else ',') + json.dumps(record)
+                        first = False
+            if not ndjson:
+                yield ']'
+
+        mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+        return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+api.add_resource(StudentAPI, '/api/students', '/api/students/<int:student_id>')
+
+
+# Endpoint API untuk membaca dan menyimpan absensi satu hari sekaligus
+class AttendanceBatchAPI(Resource):
+    method_decorators = [walikelas_permission.union(sekretaris_permission).require(http_exception=403), login_required]
+
+    def get(self, tanggal):
+        tanggal = self._parse(tanggal)
+        query = db.session.query(Attendance.student_id, Attendance.status).filter(Attendance.tanggal == tanggal)
+        if request.args.get('kelas'):
+            query = query.join(Student, Student.id == Attendance.student_id).filter(Student.kelas == request.args['kelas'])
+        return jsonify({
+            'tanggal': tanggal.isoformat(),
+            'records': [{'student_id': student_id, 'status': status} for student_id, status in query.order_by(Attendance.student_id)]
+        })
+
+    def put(self, tanggal):
+        tanggal = self._parse(tanggal)
+        payload = request.get_json(silent=True) or {}
+        try:
+            statuses = {int(record['student_id']): record['status'] for record in payload.get('records', [])}
+        except (KeyError, TypeError, ValueError, AttributeError):
+            abort(400)
+        if not statuses or any(status not in STATUSES for status in statuses.values()):
+            abort(400)
+        known = {student_id for student_id, in db.session.query(Student.id).filter(Student.id.in_(list(statuses)))}
+        unknown = sorted(set(statuses) - known)
+        if unknown:
+            return {'message': 'Unknown student_id', 'student_ids': unknown}, 422
+        changed = save_attendance(tanggal, statuses, current_user.id)
+        if changed:
+            invalidate_reports(tanggal)
+            check_absence_and_notify()
+        current_app.logger.info(f'User {current_user.username} synced attendance for {tanggal} via API ({len(changed)} changed)')
+        return {'tanggal': tanggal.isoformat(), 'received': len(statuses), 'changed': len(changed)}
+
+    post = put
+
+    @staticmethod
+    def _parse(tanggal):
+        try:
+            return parse_date(tanggal)
+        except ValueError:
+            abort(400)
+
+
+api.add_resource(AttendanceBatchAPI, '/api/attendance/<string:tanggal>')
+
+
+@bp.route('/api/attendance_data', methods=['GET'])
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+@read_only_view(db.session)
+def attendance_data():
+    start = request.args.get('start', type=parse_date)
+    end = request.args.get('end', type=parse_date)
+    kelas = request.args.get('kelas')
+    dates, students, counts, statuses = attendance_matrix(start, end, kelas)
+
+    data = {
+        'dates': [date.strftime('%Y-%m-%d') for date in dates],
+        'attendance': [{
+            'id': student.id,
+            'name': student.nama,
+            'kelas': student.kelas,
+            'counts': counts[i],
+            'status': statuses[i]
+        } for i, student in enumerate(students)]
+    }
+
+    return jsonify(data)
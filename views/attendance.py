@@ -0,0 +1,55 @@
+from datetime import date
+
+from flask import Blueprint, current_app, render_template, request, redirect, url_for
+from flask_login import login_required, current_user
+
+from extensions import walikelas_permission, sekretaris_permission
+from models import db, Attendance, MonthlySummary, save_attendance, class_students, kelas_choices
+from views import selected_kelas, invalidate_reports, clear_reports
+
+bp = Blueprint('attendance', __name__)
+
+
+@bp.route('/index', methods=['GET', 'POST'])
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+def index():
+    kelas = selected_kelas()
+    students = class_students(kelas)
+    today = date.today()
+    if request.method == 'POST':
+        # Hanya baris siswa kelas yang dipilih yang dibaca dan ditulis
+        statuses = {student.id: request.form.get(f'status-{student.id}', 'H') for student in students}
+        changed = save_attendance(today, statuses, current_user.id)
+        if changed:
+            invalidate_reports(today, kelas)
+        current_app.logger.info(f'User {current_user.username} updated attendance for today, kelas {kelas or "semua"} ({len(changed)} changed)')
+        return redirect(url_for('reports.rekap', kelas=kelas))
+    return render_template('attendance/index.html', students=students, today=today, kelas=kelas, kelas_list=kelas_choices())
+
+
+@bp.route('/update/<int:id>', methods=['GET', 'POST'])
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+def update(id):
+    attendance = Attendance.query.get_or_404(id)
+    if request.method == 'POST':
+        status = request.form['status']
+        attendance.status = status
+        db.session.commit()
+        invalidate_reports(attendance.tanggal, attendance.student.kelas)
+        current_app.logger.info(f'User {current_user.username} updated attendance for student {attendance.student_id} on {attendance.tanggal}')
+        return redirect(url_for('reports.rekap', kelas=attendance.student.kelas))
+    return render_template('attendance/update.html', attendance=attendance)
+
+
+@bp.route('/delete_all', methods=['POST'])
+@login_required
+@walikelas_permission.require(http_exception=403)
+def delete_all():
+    Attendance.query.delete()
+    MonthlySummary.query.delete()
+    db.session.commit()
+    clear_reports()
+    current_app.logger.info(f'User {current_user.username} deleted all attendance records')
+    return redirect(url_for('reports.rekap'))
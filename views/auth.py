@@ -0,0 +1,79 @@
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session, make_response
+from flask_login import login_user, logout_user, login_required, current_user
+from flask_principal import Identity, AnonymousIdentity, identity_changed, RoleNeed, UserNeed
+from flask_wtf import FlaskForm
+from wtforms import StringField, PasswordField, SubmitField
+from wtforms.validators import DataRequired, Length
+
+from auth_cache import verify_password
+from extensions import login_manager, user_cache, login_throttle
+from models import User
+
+bp = Blueprint('auth', __name__)
+
+
+class LoginForm(FlaskForm):
+    username = StringField('Username', validators=[DataRequired(), Length(min=2, max=20)])
+    password = PasswordField('Password', validators=[DataRequired()])
+    submit = SubmitField('Login')
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return user_cache.get(int(user_id))
+
+
+def on_identity_loaded(sender, identity):
+    identity.user = current_user
+    if hasattr(current_user, 'id'):
+        identity.provides.add(UserNeed(current_user.id))
+        if current_user.role == 'walikelas':
+            identity.provides.add(RoleNeed('walikelas'))
+        elif current_user.role == 'sekretaris':
+            identity.provides.add(RoleNeed('sekretaris'))
+
+
+@bp.route('/')
+def home():
+    current_app.logger.info('Home page accessed')
+    if current_user.is_authenticated:
+        return redirect(url_for('reports.total_rekap'))
+    return redirect(url_for('auth.login'))
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    form = LoginForm()
+    if form.validate_on_submit():
+        keys = (f'ip:{request.remote_addr}', f'user:{form.username.data.lower()}')
+        retry_after = login_throttle.retry_after(*keys)
+        if retry_after:
+            flash(f'Terlalu banyak percobaan login. Coba lagi dalam {int(retry_after) + 1} detik.', 'danger')
+            current_app.logger.warning(f'Login throttled for username: {form.username.data} from {request.remote_addr}')
+            response = make_response(render_template('auth/login.html', form=form, error=True), 429)
+            response.headers['Retry-After'] = str(int(retry_after) + 1)
+            return response
+        user = User.query.filter_by(username=form.username.data).first()
+        if verify_password(user, form.password.data):
+            login_throttle.reset(*keys)
+            login_user(user_cache.put(user))
+            identity_changed.send(current_app._get_current_object(), identity=Identity(user.id))
+            current_app.logger.info(f'User {user.username} logged in')
+            return redirect(url_for('reports.total_rekap'))
+        else:
+            login_throttle.fail(*keys)
+            flash('Invalid username or password', 'danger')
+            current_app.logger.warning(f'Failed login attempt for username: {form.username.data}')
+            return render_template('auth/login.html', form=form, error=True)
+    return render_template('auth/login.html', form=form)
+
+
+@bp.route('/logout')
+@login_required
+def logout():
+    current_app.logger.info(f'User {current_user.username} logged out')
+    logout_user()
+    for key in ('identity.name', 'identity.auth_type'):
+        session.pop(key, None)
+    identity_changed.send(current_app._get_current_object(), identity=AnonymousIdentity())
+    return redirect(url_for('auth.login'))
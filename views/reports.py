@@ -0,0 +1,265 @@
+import calendar
+from datetime import datetime, date, timedelta
+
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, make_response, jsonify, \
+    send_file, abort, Response, stream_with_context
+from flask_login import login_required, current_user
+from werkzeug.utils import secure_filename
+
+import audit
+import exports
+from charts import CHART_KINDS, CHART_FORMATS, ChartKey, chart_data
+from extensions import walikelas_permission, sekretaris_permission, report_cache, chart_cache, chart_renderer, pdf_jobs, \
+    metrics
+from models import db, Attendance, totals_by_month, save_attendance, class_students, kelas_choices
+from pdf_jobs import render_pdf
+from report_cache import cached_report, CacheEntry
+from sqlite_tuning import read_only_view
+from views import parse_date, selected_kelas, invalidate_reports, check_absence_and_notify
+
+bp = Blueprint('reports', __name__)
+
+
+def month_period():
+    year = request.args.get('year', datetime.now().year, type=int)
+    month = request.args.get('month', datetime.now().month, type=int)
+    return year, month, None
+
+
+def date_period():
+    date_value = request.args.get('date', datetime.now().date(), type=parse_date)
+    return date_value.year, date_value.month, date_value.isoformat()
+
+
+@bp.route('/rekap', methods=['GET', 'POST'])
+@cached_report(report_cache, 'rekap', date_period)
+@read_only_view(db.session)
+def rekap():
+    date_value = request.args.get('date', datetime.now().date(), type=parse_date)
+    kelas = selected_kelas()
+    students = class_students(kelas)
+    student_ids = [student.id for student in students] if kelas else None
+
+    if request.method == 'POST' and current_user.is_authenticated and (current_user.role == 'walikelas' or current_user.role == 'sekretaris'):
+        statuses = {student.id: request.form.get(f'status-{student.id}', 'H') for student in students}
+        changed = save_attendance(date_value, statuses, current_user.id)
+        if changed:
+            invalidate_reports(date_value, kelas)
+        current_app.logger.info(f'User {current_user.username} updated attendance for {date_value}, kelas {kelas or "semua"} ({len(changed)} changed)')
+        check_absence_and_notify()
+        return redirect(url_for('reports.rekap', date=date_value, kelas=kelas))
+
+    recorded = db.session.query(Attendance.id).filter_by(tanggal=date_value)
+    if student_ids is not None:
+        recorded = recorded.filter(Attendance.student_id.in_(student_ids))
+    if recorded.first() is None:
+        flash(f'Tidak ada data kehadiran untuk tanggal {date_value}. Hari libur.')
+        totals = {}
+    else:
+        totals = totals_by_month(date_value.year, date_value.month, student_ids)
+
+    return render_template('attendance/rekap.html', students=students, totals=totals, date=date_value,
+                           kelas=kelas, kelas_list=kelas_choices())
+
+
+@bp.route('/total_rekap', methods=['GET'])
+@cached_report(report_cache, 'total_rekap', month_period)
+@read_only_view(db.session)
+def total_rekap():
+    kelas = selected_kelas()
+    students = class_students(kelas)
+    year = request.args.get('year', datetime.now().year, type=int)
+    month = request.args.get('month', datetime.now().month, type=int)
+    month_name = calendar.month_name[month]
+    totals = totals_by_month(year, month, [student.id for student in students] if kelas else None)
+    return render_template('attendance/total_rekap.html', students=students, totals=totals, year=year, month=month, month_name=month_name, calendar=calendar,
+                           kelas=kelas, kelas_list=kelas_choices())
+
+
+def pdf_filename(year, month, kelas=None):
+    return f'rekap_absensi_{year}_{month}' + (f'_{secure_filename(kelas)}' if kelas else '') + '.pdf'
+
+
+def month_report(year, month, kelas=None):
+    students = class_students(kelas)
+    totals = totals_by_month(year, month, [student.id for student in students] if kelas else None)
+    month_name = calendar.month_name[month]
+    html = render_template('attendance/total_rekap_pdf.html', students=students, totals=totals, year=year, month=month, month_name=month_name, calendar=calendar, kelas=kelas)
+    table = {
+        'title': f'Total Rekap Absensi Bulanan - {month_name} {year}' + (f' - Kelas {kelas}' if kelas else ''),
+        'columns': ['No', 'Nama', 'Kelas', 'Hadir', 'Alfa', 'Izin', 'Sakit'],
+        'rows': [[i, student.nama, student.kelas, *totals[student.id]] for i, student in enumerate(students, 1)],
+    }
+    return html, table
+
+
+@bp.route('/rekap/pdf', methods=['GET'])
+@cached_report(report_cache, 'rekap_pdf', month_period)
+@read_only_view(db.session)
+def rekap_pdf():
+    year = request.args.get('year', datetime.now().year, type=int)
+    month = request.args.get('month', datetime.now().month, type=int)
+    kelas = selected_kelas()
+    html, table = month_report(year, month, kelas)
+    # Konversi PDF dijalankan lewat job; render langsung hanya bila diminta (sync=1)
+    if not request.args.get('sync', type=int):
+        job_id = pdf_jobs.submit(year, month, html, table, pdf_filename(year, month, kelas))
+        return redirect(url_for('reports.rekap_pdf_job_wait', job_id=job_id, kelas=kelas))
+    pdf = render_pdf(html, table, current_app.config['WKHTMLTOPDF_PATH'])
+
+    response = make_response(pdf)
+    response.headers['Content-Type'] = 'application/pdf'
+    response.headers['Content-Disposition'] = f'attachment; filename={pdf_filename(year, month, kelas)}'
+    return response
+
+
+@bp.route('/rekap/pdf/jobs', methods=['POST'])
+@login_required
+def rekap_pdf_job():
+    year = request.values.get('year', datetime.now().year, type=int)
+    month = request.values.get('month', datetime.now().month, type=int)
+    kelas = selected_kelas()
+    html, table = month_report(year, month, kelas)
+    job_id = pdf_jobs.submit(year, month, html, table, pdf_filename(year, month, kelas))
+    current_app.logger.info(f'User {current_user.username} requested PDF job {job_id}')
+    return jsonify({
+        'id': job_id,
+        'status': pdf_jobs.status(job_id),
+        'status_url': url_for('reports.rekap_pdf_job_status', job_id=job_id),
+        'download_url': url_for('reports.rekap_pdf_job_download', job_id=job_id)
+    }), 202
+
+
+@bp.route('/rekap/pdf/jobs/<job_id>', methods=['GET'])
+@login_required
+def rekap_pdf_job_status(job_id):
+    status = pdf_jobs.status(job_id)
+    if status is None:
+        abort(404)
+    return jsonify({'id': job_id, 'status': status})
+
+
+@bp.route('/rekap/pdf/jobs/<job_id>/wait', methods=['GET'])
+def rekap_pdf_job_wait(job_id):
+    """Halaman tunggu untuk tombol PDF: dimuat ulang sampai job selesai, lalu mengirim file."""
+    status = pdf_jobs.status(job_id)
+    if status is None:
+        abort(404)
+    if status == 'done':
+        return send_file(pdf_jobs.path(job_id), mimetype='application/pdf', as_attachment=True,
+                         download_name=pdf_jobs.download_name(job_id))
+    year, month, _ = job_id.split('-')
+    return render_template('attendance/pdf_job.html', status=status, year=int(year), month=int(month),
+                           kelas=request.args.get('kelas', ''))
+
+
+@bp.route('/rekap/pdf/jobs/<job_id>/download', methods=['GET'])
+@login_required
+def rekap_pdf_job_download(job_id):
+    if pdf_jobs.status(job_id) != 'done':
+        abort(404)
+    return send_file(pdf_jobs.path(job_id), mimetype='application/pdf', as_attachment=True,
+                     download_name=pdf_jobs.download_name(job_id))
+
+
+def export_period():
+    end = request.args.get('end', date.today(), type=parse_date)
+    start = request.args.get('start', date(end.year, 1, 1), type=parse_date)
+    if start > end:
+        abort(400)
+    return start, end
+
+
+def export_response(batches, columns, fmt, filename, title):
+    if fmt not in exports.EXPORT_FORMATS:
+        abort(404)
+    kelas = selected_kelas()
+    filename += f'_{secure_filename(kelas)}' if kelas else ''
+    current_app.logger.info(f'User {current_user.username} exported {filename}.{fmt}')
+    return Response(stream_with_context(exports.export_rows(batches, columns, fmt, title)),
+                    mimetype=exports.EXPORT_FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={filename}.{fmt}'})
+
+
+@bp.route('/export/attendance.<fmt>')
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+def export_attendance(fmt):
+    start, end = export_period()
+    batches = exports.attendance_batches(start, end, selected_kelas(), current_app.config['EXPORT_BATCH_SIZE'])
+    return export_response(batches, exports.ATTENDANCE_COLUMNS, fmt, f'absensi_{start}_{end}', 'Absensi')
+
+
+@bp.route('/export/totals.<fmt>')
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+def export_totals(fmt):
+    start, end = export_period()
+    batches = exports.total_batches(start, end, selected_kelas(), current_app.config['EXPORT_BATCH_SIZE'])
+    return export_response(batches, exports.TOTAL_COLUMNS, fmt, f'rekap_bulanan_{start:%Y_%m}_{end:%Y_%m}', 'Rekap Bulanan')
+
+
+@bp.route('/attendance_chart')
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+def attendance_chart_page():
+    end = request.args.get('end', date.today(), type=parse_date)
+    start = request.args.get('start', end - timedelta(days=30), type=parse_date)
+    kelas = request.args.get('kelas', '')
+    return render_template('attendance/attendance_chart.html', start=start, end=end, kelas=kelas,
+                           kelas_list=kelas_choices(), kinds=CHART_KINDS)
+
+
+@bp.route('/charts/<kind>.<fmt>')
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+@read_only_view(db.session)
+def attendance_chart_image(kind, fmt):
+    if kind not in CHART_KINDS or fmt not in CHART_FORMATS:
+        abort(404)
+    end = request.args.get('end', date.today(), type=parse_date)
+    start = request.args.get('start', end - timedelta(days=30), type=parse_date)
+    if start > end or (end - start).days > current_app.config['CHART_MAX_DAYS']:
+        abort(400)
+    key = ChartKey(kind, fmt, request.args.get('kelas', ''), start, end)
+    entry = chart_cache.get(key)
+    if entry is None:
+        data = chart_data(kind, start, end, key.kelas or None)
+        entry = CacheEntry(chart_renderer.render(kind, data, fmt), CHART_FORMATS[fmt], {})
+        chart_cache.set(key, entry)
+    return entry.to_response().make_conditional(request)
+
+
+@bp.route('/metrics')
+def metrics_endpoint():
+    token = current_app.config['METRICS_TOKEN']
+    authorized = token and request.headers.get('Authorization') == f'Bearer {token}'
+    if not authorized and not (current_user.is_authenticated and current_user.role == 'walikelas'):
+        abort(403)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@bp.route('/audit_log')
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+@read_only_view(db.session)
+def audit_log():
+    query = audit.filtered_query(request.args)
+    logs, next_cursor = audit.audit_page(query, after=audit.decode_cursor(request.args.get('after')))
+    filters = {name: request.args.get(name, '') for name in ('model', 'model_id', 'user_id', 'action', 'start', 'end')}
+    return render_template('logs/audit_log.html', logs=logs, next_cursor=next_cursor, filters=filters)
+
+
+@bp.route('/audit_log/export')
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+@read_only_view(db.session)
+def audit_log_export():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'jsonl'):
+        abort(400)
+    query = audit.filtered_query(request.args)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    current_app.logger.info(f'User {current_user.username} exported audit log as {fmt}')
+    return Response(stream_with_context(audit.export_rows(query, fmt)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=audit_log.{fmt}'})
@@ -0,0 +1,151 @@
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify, stream_template
+from flask_login import login_required, current_user
+from flask_wtf import FlaskForm
+from wtforms import StringField, SubmitField
+from wtforms.validators import DataRequired, Length, ValidationError
+
+from extensions import walikelas_permission, sekretaris_permission
+from models import db, Student
+from student_search import search_filter, search_students, keyset_page, decode_cursor
+from views import clear_reports
+
+bp = Blueprint('students', __name__)
+
+STUDENTS_PER_PAGE = 10
+MAX_IMPORT_ERRORS = 20  # Jumlah error per baris yang ditampilkan
+
+
+class StudentForm(FlaskForm):
+    nama = StringField('Nama', validators=[DataRequired(), Length(min=2, max=50)])
+    kelas = StringField('Kelas', validators=[DataRequired(), Length(min=1, max=20)])
+    submit = SubmitField('Submit')
+
+    def validate_nama(self, nama):
+        student = Student.query.filter_by(nama=nama.data).first()
+        if student:
+            raise ValidationError('Nama siswa sudah ada. Silakan gunakan nama yang berbeda.')
+
+
+@bp.route('/students', methods=['GET'])
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+def students():
+    show_all = request.args.get('show_all', 'false') == 'true'
+    search_query = request.args.get('search', '').strip()
+
+    students_query = Student.query
+    if search_query:
+        students_query = students_query.filter(search_filter(search_query))
+
+    if show_all:
+        # Dirender bertahap agar seluruh tabel tidak dimuat ke memori sekaligus
+        students = students_query.order_by(Student.id).yield_per(500)
+        current_app.logger.info(f'User {current_user.username} viewed all students')
+        return stream_template('student/students.html', students=students, show_all=show_all, search_query=search_query)
+    else:
+        page = keyset_page(students_query,
+                           after=decode_cursor(request.args.get('after')),
+                           before=decode_cursor(request.args.get('before')),
+                           per_page=STUDENTS_PER_PAGE)
+        current_app.logger.info(f'User {current_user.username} viewed students page')
+        return render_template('student/students.html', students=page.items, page=page, search_query=search_query, show_all=show_all)
+
+
+@bp.route('/api/students/search', methods=['GET'])
+@login_required
+@walikelas_permission.union(sekretaris_permission).require(http_exception=403)
+def search_students_api():
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    if not query:
+        return jsonify([])
+    return jsonify([{'id': student.id, 'nama': student.nama, 'kelas': student.kelas}
+                    for student in search_students(query, limit)])
+
+
+@bp.route('/student/add', methods=['GET', 'POST'])
+@login_required
+@walikelas_permission.require(http_exception=403)
+def add_student():
+    form = StudentForm()
+    if form.validate_on_submit():
+        student = Student(nama=form.nama.data, kelas=form.kelas.data)
+        db.session.add(student)
+        db.session.commit()
+        clear_reports()
+        current_app.logger.info(f'User {current_user.username} added student {student.nama}')
+        return redirect(url_for('students.students'))
+    return render_template('student/add_student.html', form=form)
+
+
+@bp.route('/student/edit/<int:id>', methods=['GET', 'POST'])
+@login_required
+@walikelas_permission.require(http_exception=403)
+def edit_student(id):
+    student = Student.query.get_or_404(id)
+    form = StudentForm()
+    if form.validate_on_submit():
+        student.nama = form.nama.data
+        student.kelas = form.kelas.data
+        db.session.commit()
+        clear_reports()
+        current_app.logger.info(f'User {current_user.username} edited student {student.nama}')
+        return redirect(url_for('students.students'))
+    form.nama.data = student.nama
+    form.kelas.data = student.kelas
+    return render_template('student/edit_student.html', form=form)
+
+
+@bp.route('/student/delete/<int:id>', methods=['POST'])
+@login_required
+@walikelas_permission.require(http_exception=403)
+def delete_student(id):
+    student = Student.query.get_or_404(id)
+    db.session.delete(student)
+    db.session.commit()
+    clear_reports()
+    current_app.logger.info(f'User {current_user.username} deleted student {student.nama}')
+    return redirect(url_for('students.students'))
+
+
+# Endpoint untuk mengunggah file Excel/CSV dengan data siswa
+@bp.route('/upload_students', methods=['POST'])
+@login_required
+@walikelas_permission.require(http_exception=403)
+def upload_students():
+    if 'file' not in request.files:
+        flash('No file part', 'danger')
+        return redirect(url_for('students.students'))
+    file = request.files['file']
+    if file.filename == '':
+        flash('No selected file', 'danger')
+        return redirect(url_for('students.students'))
+    if file and allowed_file(file.filename):
+        # pandas hanya dimuat saat ada file yang diimpor
+        from student_import import import_students
+
+        dry_run = request.form.get('dry_run') == 'on'
+        try:
+            result = import_students(file.stream, file.filename, dry_run=dry_run, user_id=current_user.id)
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error processing file: {str(e)}', 'danger')
+            return redirect(url_for('students.students'))
+        for row, message in result.errors[:MAX_IMPORT_ERRORS]:
+            flash(f'Baris {row}: {message}', 'warning')
+        if len(result.errors) > MAX_IMPORT_ERRORS:
+            flash(f'... dan {len(result.errors) - MAX_IMPORT_ERRORS} error lainnya', 'warning')
+        if dry_run:
+            flash(f'Dry run: {result.valid} siswa valid, {len(result.errors)} baris ditolak', 'info')
+        else:
+            if result.inserted:
+                clear_reports()
+            current_app.logger.info(f'User {current_user.username} imported {result.inserted} students from {file.filename}')
+            flash(f'{result.inserted} students successfully uploaded, {len(result.errors)} rows skipped', 'success')
+    else:
+        flash('File harus berformat .xlsx atau .csv', 'danger')
+    return redirect(url_for('students.students'))
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'xlsx', 'csv'}